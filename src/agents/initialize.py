@@ -106,7 +106,7 @@ def initialize_agent(
     initialize_tools(tool_registry)
 
     # Create memory system
-    memory_system = MemorySystem(storage_dir=memory_dir)
+    memory_system = MemorySystem(storage_dir=memory_dir, tool_registry=tool_registry)
 
     # Create and return agent engine
     return AgentEngine(
@@ -10,22 +10,88 @@ This module provides functions to:
 
 import os
 import json
+import time
+import sqlite3
+import threading
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple, Optional
-from dotenv import load_dotenv
 
-from agents.types.weather import fetch_weather
-from core.semantic_metric_layer import get_constant, evaluate_formula
+from agents.types.weather import fetch_weather, afetch_weather
+from core.config import get_config, load_env_file
+from core.semantic_metric_layer import get_constant, evaluate_formula, evaluate_formula_array
+from core.logging import get_logger
+
+logger = get_logger(__name__)
 
 # Load environment variables
-load_dotenv()
+load_env_file()
+
+# In-process cache of weather API responses keyed on rounded coordinates
+WEATHER_CACHE_TTL_SECONDS = 600
+WEATHER_CACHE_MAXSIZE = 1024
+_weather_cache: Dict[Tuple[float, float, str], Tuple[float, Dict[str, Any]]] = {}
+
+# Persistent copy of the weather cache (path from the weather_cache_path
+# setting) so restarted and sibling worker processes reuse recent responses
+_disk_cache: Optional[Tuple[str, sqlite3.Connection]] = None
+_disk_cache_lock = threading.Lock()
+
+# Production impact estimates keyed on (id(weather_data), system_capacity_kw);
+# entries keep a reference to their weather data so ids cannot be reused
+_impact_cache: Dict[Tuple[int, float], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+# Both in-memory caches are shared by the threads serving requests
+_memory_cache_lock = threading.Lock()
+
+def clear_weather_cache() -> None:
+    """Clear cached weather responses and production impact estimates."""
+    with _memory_cache_lock:
+        _weather_cache.clear()
+        _impact_cache.clear()
+
+    with _disk_cache_lock:
+        try:
+            conn = _get_disk_cache()
+            if conn is not None:
+                conn.execute("DELETE FROM weather")
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Could not clear persistent weather cache: {e}")
 
 def get_weather_for_location(lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
     """
     Get current and forecast weather data for a specific location.
 
+    Responses are cached for WEATHER_CACHE_TTL_SECONDS per location
+    (coordinates rounded to 3 decimals) and units, in memory and in the
+    persistent cache at the weather_cache_path setting.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        units: Units (metric, imperial)
+
+    Returns:
+        Dictionary with weather data
+    """
+    key = (round(lat, 3), round(lon, 3), units)
+
+    weather_data = _get_cached_weather(key)
+    if weather_data is None:
+        weather_data = fetch_weather(lat, lon, units)
+        _store_weather(key, weather_data)
+
+    return weather_data
+
+async def aget_weather_for_location(lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
+    """
+    Get weather data for a location without blocking the event loop.
+
+    Shares the response cache with get_weather_for_location, so awaiting
+    this from an async endpoint also warms the cache for synchronous code
+    that needs the same location.
+
     Args:
         lat: Latitude
         lon: Longitude
@@ -34,7 +100,137 @@ def get_weather_for_location(lat: float, lon: float, units: str = "metric") -> D
     Returns:
         Dictionary with weather data
     """
-    return fetch_weather(lat, lon, units)
+    key = (round(lat, 3), round(lon, 3), units)
+
+    weather_data = _get_cached_weather(key)
+    if weather_data is None:
+        weather_data = await afetch_weather(lat, lon, units)
+        _store_weather(key, weather_data)
+
+    return weather_data
+
+async def prefetch_weather_for_location(lat: float, lon: float, units: str = "metric") -> None:
+    """
+    Fetch weather for a location asynchronously to warm the weather cache.
+
+    Synchronous pipelines that need the same location then read the cached
+    response instead of blocking on the network. Failures are ignored so
+    those pipelines can apply their own fallbacks.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        units: Units (metric, imperial)
+    """
+    try:
+        await aget_weather_for_location(lat, lon, units)
+    except Exception as e:
+        logger.debug(f"Weather prefetch failed: {e}")
+
+def _get_cached_weather(key: Tuple[float, float, str]) -> Optional[Dict[str, Any]]:
+    """Get a cached weather response if it has not expired."""
+    with _memory_cache_lock:
+        entry = _weather_cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < WEATHER_CACHE_TTL_SECONDS:
+        return entry[1]
+
+    # Fall back to the persistent cache, keeping the entry's original age
+    stored = _load_persisted_weather(key)
+    if stored is None:
+        return None
+    age, weather_data = stored
+    _remember_weather(key, weather_data, age)
+    return weather_data
+
+def _store_weather(key: Tuple[float, float, str], weather_data: Dict[str, Any]) -> None:
+    """Cache a weather response in memory and in the persistent cache."""
+    _remember_weather(key, weather_data)
+    _persist_weather(key, weather_data)
+
+def _remember_weather(key: Tuple[float, float, str], weather_data: Dict[str, Any],
+                      age: float = 0.0) -> None:
+    """Cache a weather response in memory, evicting the oldest entry when full."""
+    with _memory_cache_lock:
+        # Re-inserting moves the key to the end
+        _weather_cache.pop(key, None)
+        if len(_weather_cache) >= WEATHER_CACHE_MAXSIZE:
+            stale_key = next(iter(_weather_cache))
+            _impact_cache_evict(_weather_cache.pop(stale_key)[1])
+        _weather_cache[key] = (time.monotonic() - age, weather_data)
+
+def _get_disk_cache() -> Optional[sqlite3.Connection]:
+    """
+    Get the connection to the persistent weather cache.
+
+    The cache is disabled when weather_cache_path is empty. Callers must
+    hold _disk_cache_lock.
+
+    Returns:
+        SQLite connection or None if the persistent cache is disabled
+    """
+    global _disk_cache
+
+    path = get_config("weather_cache_path")
+    if not path:
+        return None
+    if _disk_cache is not None:
+        if _disk_cache[0] == path:
+            return _disk_cache[1]
+        _disk_cache[1].close()
+        _disk_cache = None
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS weather ("
+        "key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, data TEXT NOT NULL)"
+    )
+    _disk_cache = (path, conn)
+    return conn
+
+def _load_persisted_weather(key: Tuple[float, float, str]) -> Optional[Tuple[float, Dict[str, Any]]]:
+    """Get (age in seconds, weather data) from the persistent cache if not expired."""
+    with _disk_cache_lock:
+        try:
+            conn = _get_disk_cache()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT fetched_at, data FROM weather WHERE key = ?", (repr(key),)
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Persistent weather cache read failed: {e}")
+            return None
+
+    if row is None:
+        return None
+    age = time.time() - row[0]
+    if not 0 <= age < WEATHER_CACHE_TTL_SECONDS:
+        return None
+    return age, json.loads(row[1])
+
+def _persist_weather(key: Tuple[float, float, str], weather_data: Dict[str, Any]) -> None:
+    """Write a weather response to the persistent cache, ignoring failures."""
+    with _disk_cache_lock:
+        try:
+            conn = _get_disk_cache()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO weather (key, fetched_at, data) VALUES (?, ?, ?)",
+                    (repr(key), time.time(), json.dumps(weather_data))
+                )
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.debug(f"Persistent weather cache write failed: {e}")
+
+def _impact_cache_evict(weather_data: Dict[str, Any]) -> None:
+    """
+    Drop production impact estimates computed from evicted weather data.
+
+    Callers must hold _memory_cache_lock.
+    """
+    for key in [key for key in _impact_cache if key[0] == id(weather_data)]:
+        del _impact_cache[key]
 
 def extract_solar_relevant_weather(weather_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -106,6 +302,67 @@ def estimate_production_impact(weather_data: Dict[str, Any],
     Returns:
         Dictionary with production impact estimates
     """
+    # Repeat calls for the same (cached) weather data reuse the estimate
+    key = (id(weather_data), system_capacity_kw)
+    with _memory_cache_lock:
+        entry = _impact_cache.get(key)
+    if entry is not None and entry[0] is weather_data:
+        return entry[1]
+
+    impact = _estimate_production_impact(weather_data, system_capacity_kw)
+
+    with _memory_cache_lock:
+        if len(_impact_cache) >= WEATHER_CACHE_MAXSIZE:
+            del _impact_cache[next(iter(_impact_cache))]
+        _impact_cache[key] = (weather_data, impact)
+
+    return impact
+
+# Weather condition codes used by _impact_kernel (0 means no adjustment)
+_CONDITION_RAIN, _CONDITION_SNOW, _CONDITION_FOG = 1, 2, 3
+_WEATHER_CONDITION_CODES = {
+    "Rain": _CONDITION_RAIN,
+    "Drizzle": _CONDITION_RAIN,
+    "Thunderstorm": _CONDITION_RAIN,
+    "Snow": _CONDITION_SNOW,
+    "Sleet": _CONDITION_SNOW,
+    "Fog": _CONDITION_FOG,
+}
+
+def _impact_kernel(base_factors: np.ndarray, pop: np.ndarray, conditions: np.ndarray,
+                   system_capacity_kw: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply weather adjustments and convert production factors to daily kWh.
+
+    Args:
+        base_factors: Production factor per day before weather adjustment
+        pop: Probability of precipitation per day
+        conditions: Weather condition code per day (see _WEATHER_CONDITION_CODES)
+        system_capacity_kw: Solar system capacity in kW
+
+    Returns:
+        Tuple of (expected_kwh, production_factor) arrays
+    """
+    rain_factor = get_constant('solar_panel.weather_impact.rain_factor')
+    rain_impact = get_constant('solar_panel.weather_impact.precipitation_impact.rain')
+    snow_factor = get_constant('solar_panel.weather_impact.snow_factor')
+    snow_impact = get_constant('solar_panel.weather_impact.precipitation_impact.snow')
+    fog_factor = get_constant('solar_panel.weather_impact.fog_factor')
+    peak_sun_hours = get_constant('solar_panel.peak_sun_hours')
+
+    weather_adjustment = np.select(
+        [conditions == _CONDITION_RAIN, conditions == _CONDITION_SNOW, conditions == _CONDITION_FOG],
+        [rain_factor - rain_impact * pop, snow_factor - snow_impact * pop, fog_factor],
+        default=1.0
+    )
+    production_factors = base_factors * weather_adjustment
+    expected_kwh = system_capacity_kw * production_factors * peak_sun_hours
+
+    return expected_kwh, production_factors
+
+def _estimate_production_impact(weather_data: Dict[str, Any],
+                                system_capacity_kw: float) -> Dict[str, Any]:
+    """Compute the production impact estimate for estimate_production_impact."""
     solar_weather = extract_solar_relevant_weather(weather_data)
 
     # Current conditions impact
@@ -143,58 +400,58 @@ def estimate_production_impact(weather_data: Dict[str, Any],
     # Calculate expected kWh for current hour
     current_expected_kwh = system_capacity_kw * current_production_factor
 
-    # Daily forecast
-    daily_forecast = []
-    for day in solar_weather["daily"]:
-        day_irradiance = estimate_irradiance(day["clouds"], day["uvi"])
+    # Daily forecast: the YAML formulas are evaluated once over arrays of days
+    daily = solar_weather["daily"]
+    n_days = len(daily)
+    clouds = np.fromiter((day["clouds"] for day in daily), dtype=float, count=n_days)
+    uvi = np.fromiter((day["uvi"] for day in daily), dtype=float, count=n_days)
+    temp_day = np.fromiter((day["temp_day"] for day in daily), dtype=float, count=n_days)
+    pop = np.fromiter((day["pop"] for day in daily), dtype=float, count=n_days)
+    conditions = np.fromiter(
+        (_WEATHER_CONDITION_CODES.get(day["weather_main"], 0) for day in daily),
+        dtype=np.int8, count=n_days
+    )
+
+    clear_sky_irradiance = evaluate_formula_array('weather.uv_irradiance_estimate', {'uvi': uvi})
+    day_irradiance = evaluate_formula_array('weather.cloud_adjusted_irradiance', {
+        'clear_sky_irradiance': clear_sky_irradiance,
+        'cloud_cover': clouds
+    })
 
-        # Temperature impact on efficiency using formula from YAML
-        params = {
-            'temperature_coefficient': get_constant('solar_panel.characteristics.temperature_coefficient'),
-            'temperature': day["temp_day"],
-            'stc_temperature': stc_temperature
-        }
-        day_temp_impact = evaluate_formula('energy.temperature_impact', params)
+    # Temperature impact on efficiency using formula from YAML
+    params = {
+        'temperature_coefficient': get_constant('solar_panel.characteristics.temperature_coefficient'),
+        'temperature': temp_day,
+        'stc_temperature': stc_temperature
+    }
+    day_temp_impact = evaluate_formula_array('energy.temperature_impact', params)
 
-        # Base production factor
-        params = {
-            'irradiance': day_irradiance,
-            'stc_irradiance': stc_irradiance,
-            'temperature_impact': day_temp_impact
-        }
-        day_production_factor = evaluate_formula('energy.production_factor', params)
-
-        # Adjust for weather conditions
-        weather_adjustment = 1.0
-        if day["weather_main"] in ["Rain", "Drizzle", "Thunderstorm"]:
-            rain_factor = get_constant('solar_panel.weather_impact.rain_factor')
-            rain_impact = get_constant('solar_panel.weather_impact.precipitation_impact.rain')
-            weather_adjustment = rain_factor - (rain_impact * day["pop"])
-        elif day["weather_main"] in ["Snow", "Sleet"]:
-            snow_factor = get_constant('solar_panel.weather_impact.snow_factor')
-            snow_impact = get_constant('solar_panel.weather_impact.precipitation_impact.snow')
-            weather_adjustment = snow_factor - (snow_impact * day["pop"])
-        elif day["weather_main"] == "Fog":
-            weather_adjustment = get_constant('solar_panel.weather_impact.fog_factor')
-
-        day_production_factor *= weather_adjustment
-
-        # Calculate expected kWh for the day (using peak sun hours from YAML)
-        peak_sun_hours = get_constant('solar_panel.peak_sun_hours')
-        day_expected_kwh = system_capacity_kw * day_production_factor * peak_sun_hours
-
-        # Convert timestamp to date
-        date = datetime.fromtimestamp(day["dt"]).strftime("%Y-%m-%d")
-
-        daily_forecast.append({
-            "date": date,
+    # Base production factor
+    params = {
+        'irradiance': day_irradiance,
+        'stc_irradiance': stc_irradiance,
+        'temperature_impact': day_temp_impact
+    }
+    base_factors = evaluate_formula_array('energy.production_factor', params)
+
+    expected_kwh, production_factors = _impact_kernel(
+        base_factors, pop, conditions, system_capacity_kw
+    )
+
+    daily_forecast = [
+        {
+            # Convert timestamp to date
+            "date": datetime.fromtimestamp(day["dt"]).strftime("%Y-%m-%d"),
             "expected_kwh": day_expected_kwh,
             "production_factor": day_production_factor,
             "weather": day["weather_description"],
             "temp": day["temp_day"],
             "clouds": day["clouds"],
             "uvi": day["uvi"]
-        })
+        }
+        for day, day_expected_kwh, day_production_factor
+        in zip(daily, expected_kwh.tolist(), production_factors.tolist())
+    ]
 
     return {
         "current": {
@@ -3,28 +3,323 @@ Memory System for Solar Sage Agent.
 
 This module manages conversation history and user preferences.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import hashlib
 import json
 import os
+import shutil
+import threading
+import weakref
 from datetime import datetime
+from agents.tool_registry import ToolRegistry
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; migration is then only locked in-process
+    fcntl = None
+
+# Number of buffered interactions per user before history is written to disk
+DEFAULT_AUTOSAVE_INTERVAL = 5
+
+# Interaction fields larger than this (in characters) are stored once in the
+# blob store and referenced from history records by their SHA-256 digest
+BLOB_THRESHOLD = 2048
+BLOB_FIELDS = ("response", "context_used")
+BLOB_REF_PREFIX = "sha256:"
+
+# Per-user files, keyed by file type, with their extensions
+USER_FILE_TYPES = {
+    "history": "jsonl",
+    "preferences": "json",
+    "transcript": "jsonl",
+}
+
+# Legacy per-user files that are converted on startup, with their extensions;
+# history used to be a single JSON array instead of one record per line
+LEGACY_USER_FILE_TYPES = {
+    "history": "json",
+}
+
+# Lock file in the storage directory that serializes the legacy migration
+# across worker processes
+MIGRATION_LOCK_FILE = ".migration.lock"
+
+# Digests of the blobs in each storage directory, keyed by its absolute path;
+# a directory is scanned and migrated by the first instance that uses it
+_KNOWN_BLOBS: Dict[str, set] = {}
+_KNOWN_BLOBS_LOCK = threading.Lock()
+
+# Instances with possibly buffered interactions, flushed on interpreter exit
+_LIVE_INSTANCES: "weakref.WeakSet[MemorySystem]" = weakref.WeakSet()
+
+
+def _flush_live_instances() -> None:
+    """Make sure buffered interactions are not lost on interpreter exit."""
+    for memory_system in list(_LIVE_INSTANCES):
+        memory_system.flush_all()
+
+
+atexit.register(_flush_live_instances)
 
 
 class MemorySystem:
     """Memory system for agent conversations and user preferences."""
 
-    def __init__(self, storage_dir: str = "./data/memory"):
+    def __init__(
+        self,
+        storage_dir: str = "./data/memory",
+        autosave_interval: int = DEFAULT_AUTOSAVE_INTERVAL,
+        tool_registry: Optional[ToolRegistry] = None
+    ):
         """
         Initialize the memory system.
 
         Args:
             storage_dir: Directory to store memory files
+            autosave_interval: Number of interactions to buffer per user
+                before appending them to the history file
+            tool_registry: Registry used to store tools_used as a compact
+                bitmask of tool ids instead of a list of names
         """
         self.storage_dir = storage_dir
-        os.makedirs(storage_dir, exist_ok=True)
+        self.tool_registry = tool_registry
+        self._autosave_interval = max(1, autosave_interval)
+        self._buf: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._prefs_cache: Dict[str, Dict[str, Any]] = {}
+        # (st_mtime_ns, st_size) of each cached preferences file, or None if
+        # it did not exist; other worker processes may rewrite the files
+        self._prefs_stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._created_dirs: set = set()
+        self._blob_dir = os.path.join(storage_dir, "blobs")
+
+        storage_key = os.path.abspath(storage_dir)
+        with _KNOWN_BLOBS_LOCK:
+            if storage_key not in _KNOWN_BLOBS:
+                os.makedirs(self._blob_dir, exist_ok=True)
+                _KNOWN_BLOBS[storage_key] = self._scan_blobs()
+                with self._migration_lock():
+                    self._migrate_flat_files()
+            self._known_blobs = _KNOWN_BLOBS[storage_key]
+
+        _LIVE_INSTANCES.add(self)
+
+    def _get_user_dir(self, user_id: str) -> str:
+        """Get the shard directory holding a user's files."""
+        h = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.storage_dir, h[:2], h[2:4])
 
-    def _get_user_file(self, user_id: str, file_type: str) -> str:
+    def _get_user_file(self, user_id: str, file_type: str, ext: str = "json") -> str:
         """Get the path to a user's file."""
-        return os.path.join(self.storage_dir, f"{user_id}_{file_type}.json")
+        return os.path.join(self._get_user_dir(user_id), f"{user_id}_{file_type}.{ext}")
+
+    def _ensure_dir(self, path: str) -> None:
+        """Create the parent directory of a file on first write."""
+        directory = os.path.dirname(path)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    @contextmanager
+    def _migration_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the storage directory across processes."""
+        with open(os.path.join(self.storage_dir, MIGRATION_LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _migrate_flat_files(self) -> None:
+        """Move user files from the legacy flat layout into their shard."""
+        with os.scandir(self.storage_dir) as entries:
+            legacy = [entry.name for entry in entries if entry.is_file()]
+
+        legacy_histories = []
+        for name in legacy:
+            user_id, sep, file_name = name.rpartition("_")
+            file_type, _, ext = file_name.partition(".")
+            if not sep:
+                continue
+            if LEGACY_USER_FILE_TYPES.get(file_type) == ext:
+                legacy_histories.append((user_id, os.path.join(self.storage_dir, name)))
+                continue
+            if USER_FILE_TYPES.get(file_type) != ext:
+                continue
+
+            target = self._get_user_file(user_id, file_type, ext)
+            if os.path.exists(target):
+                continue
+            self._ensure_dir(target)
+            try:
+                os.replace(os.path.join(self.storage_dir, name), target)
+            except FileNotFoundError:
+                # Already migrated by another process
+                continue
+
+        # Convert after the moves so records already in JSONL files are kept
+        for user_id, legacy_file in legacy_histories:
+            self._convert_legacy_history(user_id, legacy_file)
+
+    def _convert_legacy_history(self, user_id: str, legacy_file: str) -> None:
+        """Convert a legacy JSON array history file into the user's JSONL history."""
+        try:
+            with open(legacy_file, "rb") as f:
+                records = json.loads(f.read())
+        except FileNotFoundError:
+            # Already converted by another process
+            return
+        except ValueError:
+            # Leave unreadable files in place rather than losing them
+            return
+        if not isinstance(records, list):
+            return
+
+        history_file = self._get_user_file(user_id, "history", "jsonl")
+        self._ensure_dir(history_file)
+
+        # Legacy records predate anything already in the JSONL history
+        tmp_file = f"{history_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as out:
+            for record in records:
+                out.write(json.dumps(record))
+                out.write("\n")
+            try:
+                with open(history_file) as existing:
+                    shutil.copyfileobj(existing, out)
+            except FileNotFoundError:
+                pass
+        os.replace(tmp_file, history_file)
+        os.remove(legacy_file)
+
+    def _scan_blobs(self) -> set:
+        """Collect the digests of blobs already present in the blob store."""
+        known = set()
+        with os.scandir(self._blob_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as blobs:
+                    known.update(
+                        entry.name[:-4] for entry in blobs
+                        if entry.name.endswith(".txt")
+                    )
+        return known
+
+    def _get_blob_file(self, digest: str) -> str:
+        """Get the path to a blob in the sharded blob store."""
+        return os.path.join(self._blob_dir, digest[:2], f"{digest}.txt")
+
+    def _store_blob(self, value: str) -> Dict[str, str]:
+        """
+        Store a value in the blob store and return a reference to it.
+
+        Args:
+            value: Text to store
+
+        Returns:
+            Reference of the form {"$ref": "sha256:<digest>"}
+        """
+        data = value.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        if digest not in self._known_blobs:
+            blob_file = self._get_blob_file(digest)
+            os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+
+            # Write to a temporary file first so readers never see partial blobs
+            tmp_file = f"{blob_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, blob_file)
+            self._known_blobs.add(digest)
+
+        return {"$ref": f"{BLOB_REF_PREFIX}{digest}"}
+
+    def _load_blob(self, ref: str) -> str:
+        """Load the text referenced by a blob reference."""
+        digest = ref[len(BLOB_REF_PREFIX):]
+        with open(self._get_blob_file(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def _resolve_refs(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Expand blob references and tool masks in a history record."""
+        for field in BLOB_FIELDS:
+            value = record.get(field)
+            if isinstance(value, dict) and "$ref" in value:
+                record[field] = self._load_blob(value["$ref"])
+
+        # Names stored with the mask win, since bit positions follow the
+        # registration order and can change between releases
+        if "tools_used" in record:
+            record.pop("tools_mask", None)
+        elif "tools_mask" in record and self.tool_registry is not None:
+            record["tools_used"] = self.tool_registry.decode_tools(
+                record.pop("tools_mask")
+            )
+        return record
+
+    def _maybe_flush(self, user_id: str) -> None:
+        """Flush a user's buffered interactions once the autosave interval is hit."""
+        if len(self._buf.get(user_id, ())) >= self._autosave_interval:
+            self._flush_user(user_id)
+
+    def _flush_user(self, user_id: str) -> None:
+        """Append a user's buffered interactions to their history file."""
+        with self._lock:
+            records = self._buf.pop(user_id, None)
+            if not records:
+                return
+
+            history_file = self._get_user_file(user_id, "history", "jsonl")
+            self._ensure_dir(history_file)
+            with open(history_file, "a") as f:
+                f.write("\n".join(json.dumps(record) for record in records))
+                f.write("\n")
+
+    def flush(self, user_id: Optional[str] = None) -> None:
+        """
+        Write buffered interactions to disk.
+
+        Args:
+            user_id: User whose buffer to flush; flushes all users if omitted
+        """
+        if user_id is None:
+            self.flush_all()
+        else:
+            self._flush_user(user_id)
+
+    def flush_all(self) -> None:
+        """Write buffered interactions for every user to disk."""
+        for user_id in list(self._buf):
+            self._flush_user(user_id)
+
+    @contextmanager
+    def transcript_writer(self, user_id: str) -> Iterator[Callable[[Dict[str, Any]], None]]:
+        """
+        Open a user's transcript file for incremental writes.
+
+        Streaming responses record partial output here as it is generated,
+        so an interrupted generation still leaves a usable transcript.
+
+        Args:
+            user_id: User identifier
+
+        Yields:
+            Function that appends a record to the transcript and flushes it
+        """
+        transcript_file = self._get_user_file(user_id, "transcript", "jsonl")
+        self._ensure_dir(transcript_file)
+        with open(transcript_file, "a") as f:
+            def write(record: Dict[str, Any]) -> None:
+                f.write(json.dumps(record))
+                f.write("\n")
+                f.flush()
+
+            yield write
 
     def add_interaction(
         self,
@@ -44,33 +339,33 @@ class MemorySystem:
             tools_used: List of tools used in the interaction
             context_used: Context information used for the response
         """
-        # TODO: Implement adding an interaction to the user's history
-        # 1. Get the user's history file path
-        # 2. Load existing history or create a new one
-        # 3. Add the new interaction with timestamp
-        # 4. Save the updated history
-        # Example implementation:
-        history_file = self._get_user_file(user_id, "history")
-
-        # Load existing history or create new
-        if os.path.exists(history_file):
-            with open(history_file, "r") as f:
-                history = json.load(f)
-        else:
-            history = []
-
-        # Add new interaction
-        history.append({
+        record = {
             "timestamp": datetime.now().isoformat(),
             "query": query,
             "response": response,
             "tools_used": tools_used or [],
             "context_used": context_used
-        })
+        }
+
+        # Store tools as a bitmask alongside the names when every tool is
+        # known to the registry
+        if tools_used and self.tool_registry is not None:
+            mask = self.tool_registry.encode_tools(tools_used)
+            if mask is not None:
+                record["tools_mask"] = mask
+
+        # Large, frequently repeated blobs are stored once and referenced
+        for field in BLOB_FIELDS:
+            value = record[field]
+            if isinstance(value, str) and len(value) > BLOB_THRESHOLD:
+                record[field] = self._store_blob(value)
 
-        # Save updated history
-        with open(history_file, "w") as f:
-            json.dump(history, f, indent=2)
+        # Buffer the new interaction; history is appended to the user's
+        # JSONL file every `autosave_interval` turns or on flush()
+        with self._lock:
+            self._buf[user_id].append(record)
+
+        self._maybe_flush(user_id)
 
     def get_recent_interactions(
         self,
@@ -87,20 +382,20 @@ class MemorySystem:
         Returns:
             List of recent interactions
         """
-        # TODO: Implement retrieving recent interactions
-        # 1. Get the user's history file path
-        # 2. Load the history if it exists
-        # 3. Return the most recent interactions up to the limit
-        # Example implementation:
-        history_file = self._get_user_file(user_id, "history")
+        history_file = self._get_user_file(user_id, "history", "jsonl")
 
-        if not os.path.exists(history_file):
-            return []
+        # Only the tail of the history file needs to be decoded
+        try:
+            with open(history_file, "rb") as f:
+                lines = deque(f, maxlen=limit)
+        except FileNotFoundError:
+            lines = ()
+        history = [json.loads(line) for line in lines if line.strip()]
 
-        with open(history_file, "r") as f:
-            history = json.load(f)
+        with self._lock:
+            history.extend(dict(record) for record in self._buf.get(user_id, ()))
 
-        return history[-limit:]
+        return [self._resolve_refs(record) for record in history[-limit:]]
 
     def store_user_preference(
         self,
@@ -116,27 +411,19 @@ class MemorySystem:
             preference_key: Preference name
             preference_value: Preference value
         """
-        # TODO: Implement storing a user preference
-        # 1. Get the user's preferences file path
-        # 2. Load existing preferences or create a new one
-        # 3. Update the preference
-        # 4. Save the updated preferences
-        # Example implementation:
         prefs_file = self._get_user_file(user_id, "preferences")
 
         # Load existing preferences or create new
-        if os.path.exists(prefs_file):
-            with open(prefs_file, "r") as f:
-                preferences = json.load(f)
-        else:
-            preferences = {}
+        preferences = self._load_preferences(user_id)
 
         # Update preference
         preferences[preference_key] = preference_value
 
         # Save updated preferences
+        self._ensure_dir(prefs_file)
         with open(prefs_file, "w") as f:
             json.dump(preferences, f, indent=2)
+        self._prefs_stamps[user_id] = self._stat_stamp(prefs_file)
 
     def get_user_preference(
         self,
@@ -155,17 +442,96 @@ class MemorySystem:
         Returns:
             Preference value or default
         """
-        # TODO: Implement retrieving a user preference
-        # 1. Get the user's preferences file path
-        # 2. Load the preferences if they exist
-        # 3. Return the preference value or the default
-        # Example implementation:
+        preferences = self._load_preferences(user_id)
+
+        return preferences.get(preference_key, default_value)
+
+    def _load_preferences(self, user_id: str) -> Dict[str, Any]:
+        """Get a user's preferences, reading them from disk when the file changed."""
         prefs_file = self._get_user_file(user_id, "preferences")
 
-        if not os.path.exists(prefs_file):
-            return default_value
+        # Stat before reading, so a concurrent rewrite is picked up next time
+        stamp = self._stat_stamp(prefs_file)
+        preferences = self._prefs_cache.get(user_id)
+        if preferences is not None and self._prefs_stamps.get(user_id) == stamp:
+            return preferences
 
-        with open(prefs_file, "r") as f:
-            preferences = json.load(f)
+        try:
+            with open(prefs_file, "rb") as f:
+                preferences = json.loads(f.read())
+        except FileNotFoundError:
+            preferences = {}
 
-        return preferences.get(preference_key, default_value)
+        self._prefs_cache[user_id] = preferences
+        self._prefs_stamps[user_id] = stamp
+        return preferences
+
+    @staticmethod
+    def _stat_stamp(path: str) -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of a file, or None if it is missing."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def warmup(self, user_ids: Optional[List[str]] = None) -> None:
+        """
+        Preload preferences for many users concurrently.
+
+        Args:
+            user_ids: Users to preload; defaults to every user with a
+                preferences file in the storage directory
+        """
+        suffix = "_preferences.json"
+
+        if user_ids is None:
+            user_ids = self._scan_users(suffix)
+
+        # List each shard directory once instead of checking each user
+        on_disk = set()
+        for shard_dir in {self._get_user_dir(user_id) for user_id in user_ids}:
+            try:
+                with os.scandir(shard_dir) as entries:
+                    on_disk.update(
+                        entry.name[:-len(suffix)] for entry in entries
+                        if entry.name.endswith(suffix)
+                    )
+            except FileNotFoundError:
+                continue
+
+        # Users without a preferences file need no disk access
+        to_load = []
+        for user_id in user_ids:
+            if user_id in self._prefs_cache:
+                continue
+            if user_id in on_disk:
+                to_load.append(user_id)
+            else:
+                self._prefs_cache[user_id] = {}
+                self._prefs_stamps[user_id] = None
+
+        if not to_load:
+            return
+
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(to_load))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self._load_preferences, to_load))
+
+    def _scan_users(self, suffix: str) -> List[str]:
+        """List users that have a file with the given suffix in any shard."""
+        users = []
+        with os.scandir(self.storage_dir) as outer:
+            for first in outer:
+                if not first.is_dir() or first.path == self._blob_dir:
+                    continue
+                with os.scandir(first.path) as inner:
+                    for second in inner:
+                        if not second.is_dir():
+                            continue
+                        with os.scandir(second.path) as entries:
+                            users.extend(
+                                entry.name[:-len(suffix)] for entry in entries
+                                if entry.name.endswith(suffix)
+                            )
+        return users
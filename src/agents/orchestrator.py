@@ -5,17 +5,25 @@ This module orchestrates the dual-agent workflow for Solar Sage.
 """
 from agents.types.retriever import RetrieverAgent
 from agents.types.response_generator import ResponseGeneratorAgent
+from agents.memory_system import MemorySystem
 from agents.integrations.weather import get_weather_context_for_rag
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from core.config import get_config
 
 class AgentOrchestrator:
     """Orchestrates the dual-agent workflow."""
 
-    def __init__(self):
-        """Initialize the orchestrator with agents."""
+    def __init__(self, memory_system: Optional[MemorySystem] = None):
+        """
+        Initialize the orchestrator with agents.
+
+        Args:
+            memory_system: Optional memory system used to persist partial
+                transcripts of streamed responses
+        """
+        self.memory_system = memory_system
         self.retriever_agent = RetrieverAgent()
-        self.response_generator_agent = ResponseGeneratorAgent()
+        self.response_generator_agent = ResponseGeneratorAgent(memory_system=memory_system)
 
     def process_query(
         self,
@@ -23,7 +31,8 @@ class AgentOrchestrator:
         lat: Optional[float] = None,
         lon: Optional[float] = None,
         include_weather: bool = False,
-        additional_context: Optional[str] = None
+        additional_context: Optional[str] = None,
+        context: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Process a user query through the dual-agent workflow.
@@ -34,15 +43,81 @@ class AgentOrchestrator:
             lon: Longitude (optional)
             include_weather: Whether to include weather context
             additional_context: Additional context to include (optional)
+            context: Pre-fetched context documents (retrieved if not provided)
 
         Returns:
             Dictionary with response and metadata
         """
+        context, notes, weather_summary = self._prepare_query(
+            query, lat, lon, include_weather, additional_context, context
+        )
+
+        # Step 5: Generate Response
+        response = self.response_generator_agent.generate_response(query, context, notes)
+
+        # Step 6: Output Response
+        return {
+            "response": response,
+            "has_weather_context": bool(weather_summary),
+            "weather_summary": weather_summary
+        }
+
+    def process_query_stream(
+        self,
+        query: str,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        include_weather: bool = False,
+        additional_context: Optional[str] = None,
+        context: Optional[List[str]] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a user query, streaming the response as it is generated.
+
+        Retrieval and weather insights run before this returns; the response
+        itself is generated lazily while "response_stream" is consumed.
+
+        Args:
+            query: User query
+            lat: Latitude (optional)
+            lon: Longitude (optional)
+            include_weather: Whether to include weather context
+            additional_context: Additional context to include (optional)
+            context: Pre-fetched context documents (retrieved if not provided)
+            user_id: User whose transcript receives the partial response (optional)
+
+        Returns:
+            Dictionary with the response chunk iterator and metadata
+        """
+        context, notes, weather_summary = self._prepare_query(
+            query, lat, lon, include_weather, additional_context, context
+        )
+
+        return {
+            "response_stream": self.response_generator_agent.generate_response_stream(
+                query, context, notes, user_id=user_id
+            ),
+            "has_weather_context": bool(weather_summary),
+            "weather_summary": weather_summary
+        }
+
+    def _prepare_query(
+        self,
+        query: str,
+        lat: Optional[float],
+        lon: Optional[float],
+        include_weather: bool,
+        additional_context: Optional[str],
+        context: Optional[List[str]]
+    ) -> Tuple[List[str], List[str], Optional[List[str]]]:
+        """Fetch context and notes for a query; returns (context, notes, weather_summary)."""
         # Step 1: User Query (already received as input)
 
         # Step 2: Fetch Context
-        max_documents = int(get_config("max_context_documents", 5))
-        context = self.retriever_agent.fetch_context(query, max_documents)
+        if context is None:
+            max_documents = int(get_config("max_context_documents", 5))
+            context = self.retriever_agent.fetch_context(query, max_documents)
 
         # Step 3: Return Context (internal step)
 
@@ -64,12 +139,4 @@ class AgentOrchestrator:
         if additional_context:
             notes.append(additional_context)
 
-        # Step 5: Generate Response
-        response = self.response_generator_agent.generate_response(query, context, notes)
-
-        # Step 6: Output Response
-        return {
-            "response": response,
-            "has_weather_context": bool(weather_summary),
-            "weather_summary": weather_summary
-        }
+        return context, notes, weather_summary
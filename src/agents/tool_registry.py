@@ -3,15 +3,76 @@ Tool Registry for Solar Sage Agent.
 
 This module manages the registration and retrieval of tools that the agent can use.
 """
+import sys
 from typing import Dict, Any, Callable, List, Optional
 
 
+def _make_dispatcher(
+    tool_name: str,
+    tool_function: Callable,
+    required_params: List[str],
+    authorization_required: bool
+) -> Callable[[Dict[str, Any], bool], Dict[str, Any]]:
+    """
+    Build a call function specialized for a tool's validation needs.
+
+    Tools without required parameters or authorization skip the checks
+    entirely; other tools check required parameters with a set lookup.
+
+    Args:
+        tool_name: Name of the tool (used in error messages)
+        tool_function: Function to execute when tool is called
+        required_params: List of required parameter names
+        authorization_required: Whether user authorization is needed
+
+    Returns:
+        Function taking (params, user_authorized) and returning the
+        execution result dictionary
+    """
+    required = frozenset(required_params)
+
+    if not required and not authorization_required:
+        def call(params: Dict[str, Any], user_authorized: bool) -> Dict[str, Any]:
+            try:
+                return {"success": True, "result": tool_function(**params)}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+        return call
+
+    def call(params: Dict[str, Any], user_authorized: bool) -> Dict[str, Any]:
+        # Check required parameters
+        if not required.issubset(params.keys()):
+            missing_params = [
+                param for param in required_params
+                if param not in params
+            ]
+            raise ValueError(
+                f"Missing required parameters for tool '{tool_name}': {missing_params}"
+            )
+
+        # Check authorization
+        if authorization_required and not user_authorized:
+            raise PermissionError(
+                f"Tool '{tool_name}' requires user authorization"
+            )
+
+        # Execute tool function with parameters
+        try:
+            return {"success": True, "result": tool_function(**params)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    return call
+
+
 class ToolRegistry:
     """Registry for agent tools."""
 
     def __init__(self):
         """Initialize an empty tool registry."""
         self.tools: Dict[str, Dict[str, Any]] = {}
+        self._tools_by_id: List[str] = []
 
     def register_tool(
         self,
@@ -25,6 +86,10 @@ class ToolRegistry:
         """
         Register a new tool in the registry.
 
+        Tool names are interned, so callers that pass the same (or an
+        interned) string to get_tool/execute_tool hit the identity fast
+        path of the dictionary lookup.
+
         Args:
             tool_name: Unique identifier for the tool
             tool_function: Function to execute when tool is called
@@ -36,12 +101,27 @@ class ToolRegistry:
         # TODO: Implement tool registration
         # The tool should be stored in self.tools with all its metadata
         # Example implementation:
+        tool_name = sys.intern(tool_name)
+
+        # Each tool gets a stable integer id (its bit in a tools mask);
+        # re-registering a tool keeps its existing id
+        existing = self.tools.get(tool_name)
+        if existing is not None:
+            tool_id = existing["id"]
+        else:
+            tool_id = len(self._tools_by_id)
+            self._tools_by_id.append(tool_name)
+
         self.tools[tool_name] = {
+            "id": tool_id,
             "function": tool_function,
             "description": tool_description,
             "required_params": required_params,
             "optional_params": optional_params or [],
-            "authorization_required": authorization_required
+            "authorization_required": authorization_required,
+            "fast_call": _make_dispatcher(
+                tool_name, tool_function, required_params, authorization_required
+            )
         }
 
     def get_tool(self, tool_name: str) -> Optional[Dict[str, Any]]:
@@ -80,6 +160,39 @@ class ToolRegistry:
             for name, tool in self.tools.items()
         ]
 
+    def encode_tools(self, tool_names: List[str]) -> Optional[int]:
+        """
+        Encode a list of tool names as a bitmask of tool ids.
+
+        Args:
+            tool_names: Names of registered tools
+
+        Returns:
+            Bitmask with one bit set per tool, or None if any tool is unknown
+        """
+        mask = 0
+        for tool_name in tool_names:
+            tool = self.tools.get(tool_name)
+            if tool is None:
+                return None
+            mask |= 1 << tool["id"]
+        return mask
+
+    def decode_tools(self, mask: int) -> List[str]:
+        """
+        Decode a bitmask of tool ids into tool names.
+
+        Args:
+            mask: Bitmask produced by encode_tools
+
+        Returns:
+            Names of the tools whose bits are set, in registration order
+        """
+        return [
+            tool_name for tool_id, tool_name in enumerate(self._tools_by_id)
+            if mask >> tool_id & 1
+        ]
+
     def execute_tool(
         self,
         tool_name: str,
@@ -101,42 +214,9 @@ class ToolRegistry:
             ValueError: If tool not found or missing required parameters
             PermissionError: If authorization required but not provided
         """
-        # TODO: Implement tool execution
-        # 1. Get the tool from the registry
-        # 2. Check that all required parameters are provided
-        # 3. Check that the user is authorized if required
-        # 4. Execute the tool function with the parameters
-        # 5. Return the result or error information
-        # Example implementation:
-        tool = self.get_tool(tool_name)
+        tool = self.tools.get(tool_name)
         if not tool:
             raise ValueError(f"Tool '{tool_name}' not found")
 
-        # Check required parameters
-        missing_params = [
-            param for param in tool["required_params"]
-            if param not in params
-        ]
-        if missing_params:
-            raise ValueError(
-                f"Missing required parameters for tool '{tool_name}': {missing_params}"
-            )
-
-        # Check authorization
-        if tool["authorization_required"] and not user_authorized:
-            raise PermissionError(
-                f"Tool '{tool_name}' requires user authorization"
-            )
-
-        # Execute tool function with parameters
-        try:
-            result = tool["function"](**params)
-            return {
-                "success": True,
-                "result": result
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        # Parameter and authorization checks are specialized per tool
+        return tool["fast_call"](params, user_authorized)
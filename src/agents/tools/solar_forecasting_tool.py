@@ -5,6 +5,7 @@ This tool provides solar energy forecasting capabilities to the RAG system,
 allowing it to generate insights about solar energy production and cost savings.
 """
 from typing import Dict, List, Any, Optional
+import numpy as np
 from pydantic import BaseModel, Field
 from agents.integrations.solar_forecasting import (
     get_solar_demand_forecast,
@@ -12,6 +13,13 @@ from agents.integrations.solar_forecasting import (
 )
 from agents.tools.base import Tool
 
+# Row templates for the Markdown tables in format_result
+_FC_ROW = "| {date} | {production:.1f} | {demand:.1f} | {net:.1f} |\n"
+_CS_ROW = (
+    "| {date} | ${consumption_cost:.2f} | ${production_value:.2f} | "
+    "${grid_purchase_cost:.2f} | ${grid_export_revenue:.2f} | ${net_savings:.2f} |\n"
+)
+
 class SolarForecastingInput(BaseModel):
     """Input for the solar forecasting tool."""
     
@@ -100,72 +108,82 @@ class SolarForecastingTool(Tool):
         forecast = result["forecast"]
         cost_savings = result["cost_savings"]
         
+        # Collect fragments and join once at the end
+        parts: List[str] = []
+        w = parts.append
+        
         # Format the forecast
-        output = "# Solar Energy Forecast\n\n"
+        w("# Solar Energy Forecast\n\n")
         
         # System information
-        output += f"## System Information\n"
-        output += f"- Location: {forecast['location']['lat']}, {forecast['location']['lon']}\n"
-        output += f"- System Capacity: {forecast['system_capacity_kw']} kW\n"
-        output += f"- Forecast Generated: {forecast['generated_at']}\n\n"
+        w(f"## System Information\n")
+        w(f"- Location: {forecast['location']['lat']}, {forecast['location']['lon']}\n")
+        w(f"- System Capacity: {forecast['system_capacity_kw']} kW\n")
+        w(f"- Forecast Generated: {forecast['generated_at']}\n\n")
         
         # Daily forecast summary
-        output += f"## Daily Forecast Summary\n\n"
-        output += "| Date | Production (kWh) | Demand (kWh) | Net (kWh) |\n"
-        output += "|------|-----------------|--------------|----------|\n"
+        w(f"## Daily Forecast Summary\n\n")
+        w("| Date | Production (kWh) | Demand (kWh) | Net (kWh) |\n")
+        w("|------|-----------------|--------------|----------|\n")
         
         for day in forecast["daily_forecast"]:
-            output += f"| {day['date']} | {day['production']:.1f} | {day['demand']:.1f} | {day['net']:.1f} |\n"
+            w(_FC_ROW.format_map(day))
         
-        output += "\n"
+        w("\n")
         
         # Cost savings analysis if available
         if cost_savings:
-            output += f"## Cost Savings Analysis\n\n"
+            w(f"## Cost Savings Analysis\n\n")
             
             summary = cost_savings["summary"]
-            output += f"### Summary ({summary['roi_days']} days)\n\n"
-            output += f"- Total Consumption Cost: ${summary['total_consumption_cost']:.2f}\n"
-            output += f"- Total Production Value: ${summary['total_production_value']:.2f}\n"
-            output += f"- Grid Purchase Cost: ${summary['total_grid_purchase_cost']:.2f}\n"
-            output += f"- Grid Export Revenue: ${summary['total_grid_export_revenue']:.2f}\n"
-            output += f"- **Net Savings: ${summary['total_net_savings']:.2f}**\n\n"
+            w(f"### Summary ({summary['roi_days']} days)\n\n")
+            w(f"- Total Consumption Cost: ${summary['total_consumption_cost']:.2f}\n")
+            w(f"- Total Production Value: ${summary['total_production_value']:.2f}\n")
+            w(f"- Grid Purchase Cost: ${summary['total_grid_purchase_cost']:.2f}\n")
+            w(f"- Grid Export Revenue: ${summary['total_grid_export_revenue']:.2f}\n")
+            w(f"- **Net Savings: ${summary['total_net_savings']:.2f}**\n\n")
             
-            output += f"### Daily Savings\n\n"
-            output += "| Date | Consumption Cost | Production Value | Grid Purchase Cost | Grid Export Revenue | Net Savings |\n"
-            output += "|------|-----------------|------------------|-------------------|-------------------|------------|\n"
+            w(f"### Daily Savings\n\n")
+            w("| Date | Consumption Cost | Production Value | Grid Purchase Cost | Grid Export Revenue | Net Savings |\n")
+            w("|------|-----------------|------------------|-------------------|-------------------|------------|\n")
             
             for day in cost_savings["daily_savings"]:
-                output += f"| {day['date']} | ${day['consumption_cost']:.2f} | ${day['production_value']:.2f} | "
-                output += f"${day['grid_purchase_cost']:.2f} | ${day['grid_export_revenue']:.2f} | ${day['net_savings']:.2f} |\n"
+                w(_CS_ROW.format_map(day))
         
         # Add insights
-        output += "\n## Insights\n\n"
-        
-        # Production insights
-        total_production = sum(day["production"] for day in forecast["daily_forecast"])
-        total_demand = sum(day["demand"] for day in forecast["daily_forecast"])
+        w("\n## Insights\n\n")
+        
+        # Production insights (one pass over the forecast for both columns)
+        days = forecast["daily_forecast"]
+        totals = np.fromiter(
+            ((day["production"], day["demand"]) for day in days),
+            dtype=np.dtype((np.float64, 2)),
+            count=len(days)
+        )
+        production = totals[:, 0]
+        total_production = float(production.sum())
+        total_demand = float(totals[:, 1].sum())
         coverage_percent = (total_production / total_demand * 100) if total_demand > 0 else 0
         
-        output += f"- Your solar system is expected to produce {total_production:.1f} kWh over the next {forecast['forecast_horizon_days']} days.\n"
-        output += f"- This covers approximately {coverage_percent:.1f}% of your expected energy demand.\n"
+        w(f"- Your solar system is expected to produce {total_production:.1f} kWh over the next {forecast['forecast_horizon_days']} days.\n")
+        w(f"- This covers approximately {coverage_percent:.1f}% of your expected energy demand.\n")
         
         # Best production day
-        best_day = max(forecast["daily_forecast"], key=lambda x: x["production"])
-        output += f"- The best day for production is {best_day['date']} with {best_day['production']:.1f} kWh expected.\n"
+        best_day = days[int(production.argmax())]
+        w(f"- The best day for production is {best_day['date']} with {best_day['production']:.1f} kWh expected.\n")
         
         # Cost insights if available
         if cost_savings:
             daily_savings = cost_savings["summary"]["total_net_savings"] / summary["roi_days"]
             annual_estimate = daily_savings * 365
             
-            output += f"- Your estimated daily savings are ${daily_savings:.2f}, which projects to ${annual_estimate:.2f} annually.\n"
+            w(f"- Your estimated daily savings are ${daily_savings:.2f}, which projects to ${annual_estimate:.2f} annually.\n")
             
             # ROI calculation (simplified)
             system_cost_estimate = forecast["system_capacity_kw"] * 1000  # Rough estimate: $1000 per kW
             simple_payback_years = system_cost_estimate / annual_estimate if annual_estimate > 0 else float('inf')
             
             if simple_payback_years < float('inf'):
-                output += f"- Based on these savings, a {forecast['system_capacity_kw']} kW system might pay for itself in approximately {simple_payback_years:.1f} years.\n"
+                w(f"- Based on these savings, a {forecast['system_capacity_kw']} kW system might pay for itself in approximately {simple_payback_years:.1f} years.\n")
         
-        return output
+        return "".join(parts)
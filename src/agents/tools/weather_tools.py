@@ -4,6 +4,7 @@ Weather tools for Solar Sage Agent.
 This module implements weather-related tools that the agent can use to provide
 solar-specific insights and recommendations based on weather data.
 """
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import pandas as pd
@@ -17,6 +18,54 @@ from agents.integrations.weather import (
     generate_weather_insights
 )
 
+# Season by month (January first) for each hemisphere
+_NORTHERN_SEASONS = (
+    "winter", "winter", "spring", "spring", "spring", "summer",
+    "summer", "summer", "fall", "fall", "fall", "winter"
+)
+_SOUTHERN_SEASONS = (
+    "summer", "summer", "fall", "fall", "fall", "winter",
+    "winter", "winter", "spring", "spring", "spring", "summer"
+)
+
+@dataclass(frozen=True)
+class DayForecast:
+    """Daily production forecast entry returned by the weather tools."""
+
+    __slots__ = ("date", "expected_kwh", "production_factor", "weather")
+
+    date: str
+    expected_kwh: float
+    production_factor: float
+    weather: str
+
+    @classmethod
+    def from_impact(cls, day: Dict[str, Any]) -> "DayForecast":
+        """
+        Build a rounded entry from a production impact daily forecast.
+
+        Args:
+            day: Entry of estimate_production_impact's daily_forecast
+
+        Returns:
+            Day forecast with kWh and production factor (%) rounded to 1 decimal
+        """
+        return cls(
+            day["date"],
+            round(day["expected_kwh"], 1),
+            round(day["production_factor"] * 100, 1),
+            day["weather"]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the entry to a JSON-serializable dictionary."""
+        return {
+            "date": self.date,
+            "expected_kwh": self.expected_kwh,
+            "production_factor": self.production_factor,
+            "weather": self.weather
+        }
+
 def get_production_forecast(
     lat: float,
     lon: float,
@@ -48,14 +97,9 @@ def get_production_forecast(
     insights = generate_weather_insights(impact)
 
     # Format response
-    daily_forecast = []
-    for day in impact["daily_forecast"][:days_ahead]:
-        daily_forecast.append({
-            "date": day["date"],
-            "expected_kwh": round(day["expected_kwh"], 1),
-            "production_factor": round(day["production_factor"] * 100, 1),
-            "weather": day["weather"]
-        })
+    daily_forecast = [
+        DayForecast.from_impact(day) for day in impact["daily_forecast"][:days_ahead]
+    ]
 
     return {
         "current": {
@@ -66,7 +110,7 @@ def get_production_forecast(
             "clouds": impact["current"]["clouds"],
             "irradiance": round(impact["current"]["irradiance_estimate"], 1)
         },
-        "daily_forecast": daily_forecast,
+        "daily_forecast": [day.to_dict() for day in daily_forecast],
         "insights": insights,
         "system_capacity_kw": system_capacity_kw
     }
@@ -93,25 +137,39 @@ def get_maintenance_recommendations(
     weather_data = get_weather_for_location(lat, lon)
     solar_weather = extract_solar_relevant_weather(weather_data)
 
+    # Read the clock once for the whole request
+    now = datetime.now()
+    three_days_str = (now + timedelta(days=3)).strftime("%Y-%m-%d")
+
     # Calculate days since last cleaning
     days_since_cleaning = None
     if last_cleaning_date:
         try:
             last_date = datetime.strptime(last_cleaning_date, "%Y-%m-%d")
-            days_since_cleaning = (datetime.now() - last_date).days
+            days_since_cleaning = (now - last_date).days
         except ValueError:
             pass
 
+    # Weather condition flags, computed once for all forecast days
+    daily = pd.DataFrame(
+        solar_weather["daily"],
+        columns=["dt", "weather_main", "weather_description", "temp_day"]
+    )
+    rain_mask = daily["weather_main"].str.contains("rain|shower|drizzle", case=False, regex=True)
+    heavy_mask = daily["weather_description"].str.contains("heavy", case=False, regex=False)
+    hot_days = int((daily["temp_day"].iloc[:7] > 35).sum())
+    snow_soon = bool(
+        daily["weather_description"].iloc[:3].str.contains("snow", case=False, regex=False).any()
+    )
+
     # Check for upcoming rain (natural cleaning)
-    rain_forecast = []
-    for day in solar_weather["daily"]:
-        weather = day["weather_main"].lower()
-        if "rain" in weather or "shower" in weather or "drizzle" in weather:
-            date = datetime.fromtimestamp(day["dt"]).strftime("%Y-%m-%d")
-            rain_forecast.append({
-                "date": date,
-                "intensity": "heavy" if "heavy" in day["weather_description"].lower() else "light"
-            })
+    rain_forecast = [
+        {
+            "date": datetime.fromtimestamp(dt).strftime("%Y-%m-%d"),
+            "intensity": "heavy" if heavy else "light"
+        }
+        for dt, heavy in zip(daily.loc[rain_mask, "dt"].tolist(), heavy_mask[rain_mask].tolist())
+    ]
 
     # Determine if cleaning is needed
     cleaning_needed = False
@@ -130,14 +188,14 @@ def get_maintenance_recommendations(
         cleaning_needed = False
 
     # Check for dust/pollen conditions
-    current_season = get_current_season(lat)
+    current_season = get_current_season(lat, now.month)
     high_pollen = current_season == "spring" and solar_weather["current"]["humidity"] < 40
 
     # Generate recommendations
     recommendations = []
 
     if cleaning_needed:
-        if rain_forecast and rain_forecast[0]["date"] <= (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d"):
+        if rain_forecast and rain_forecast[0]["date"] <= three_days_str:
             recommendations.append({
                 "type": "cleaning",
                 "action": "Wait for rain",
@@ -153,17 +211,16 @@ def get_maintenance_recommendations(
             })
 
     # Check for extreme temperatures
-    hot_days = [day for day in solar_weather["daily"][:7] if day["temp_day"] > 35]
     if hot_days:
         recommendations.append({
             "type": "monitoring",
             "action": "Monitor performance during high temperatures",
-            "reason": f"High temperatures expected on {len(hot_days)} days this week, which may reduce panel efficiency",
+            "reason": f"High temperatures expected on {hot_days} days this week, which may reduce panel efficiency",
             "priority": "medium"
         })
 
     # Check for snow if in winter
-    if current_season == "winter" and any("snow" in day["weather_description"].lower() for day in solar_weather["daily"][:3]):
+    if current_season == "winter" and snow_soon:
         if panel_tilt < 35:
             recommendations.append({
                 "type": "snow_removal",
@@ -203,44 +260,21 @@ def get_optimal_production_times(
 
     # Find best production days
     daily_forecast = impact["daily_forecast"][:days_ahead]
+    df = pd.DataFrame(daily_forecast)
 
-    # Sort days by production factor
-    sorted_days = sorted(
-        daily_forecast,
-        key=lambda x: x["production_factor"],
-        reverse=True
-    )
-
-    # Find days above threshold
-    optimal_days = [
-        {
-            "date": day["date"],
-            "expected_kwh": round(day["expected_kwh"], 1),
-            "production_factor": round(day["production_factor"] * 100, 1),
-            "weather": day["weather"]
-        }
-        for day in sorted_days
-        if day["production_factor"] * 100 >= threshold_percentage
-    ]
+    # Days above threshold, sorted by production factor (stable for ties)
+    pf = df["production_factor"].to_numpy(dtype=np.float64)
+    above = np.flatnonzero(pf * 100 >= threshold_percentage)
+    order = above[np.argsort(-pf[above], kind="stable")]
+    optimal_days = [DayForecast.from_impact(daily_forecast[i]) for i in order.tolist()]
 
     # Find best day of the week
-    days_of_week = {}
-    for day in daily_forecast:
-        date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-        day_name = date_obj.strftime("%A")
-        if day_name not in days_of_week:
-            days_of_week[day_name] = []
-        days_of_week[day_name].append(day["production_factor"])
-
-    avg_by_day = {
-        day: sum(factors) / len(factors) * 100
-        for day, factors in days_of_week.items()
-    }
-
-    best_day_of_week = max(avg_by_day.items(), key=lambda x: x[1])
+    day_names = pd.to_datetime(df["date"], format="%Y-%m-%d").dt.day_name()
+    avg_by_day = df.groupby(day_names, sort=False)["production_factor"].mean() * 100
+    best_day_of_week = (avg_by_day.idxmax(), float(avg_by_day.max()))
 
     return {
-        "optimal_days": optimal_days,
+        "optimal_days": [day.to_dict() for day in optimal_days],
         "best_day_of_week": {
             "day": best_day_of_week[0],
             "avg_production_factor": round(best_day_of_week[1], 1)
@@ -272,9 +306,11 @@ def analyze_weather_impact(
     impact = estimate_production_impact(weather_data, system_capacity_kw)
 
     # Calculate expected production for next 30 days
-    next_30_days = impact["daily_forecast"][:30]
-    total_expected_kwh = sum(day["expected_kwh"] for day in next_30_days)
-    avg_daily_expected_kwh = total_expected_kwh / len(next_30_days)
+    daily = impact["daily_forecast"][:30]
+    expected_kwh = np.fromiter((day["expected_kwh"] for day in daily), dtype=np.float64, count=len(daily))
+    production_factor = np.fromiter((day["production_factor"] for day in daily), dtype=np.float64, count=len(daily))
+    total_expected_kwh = float(expected_kwh.sum())
+    avg_daily_expected_kwh = total_expected_kwh / len(daily)
 
     # Compare with expected monthly production if provided
     comparison = None
@@ -286,28 +322,26 @@ def analyze_weather_impact(
             "weather_impact_percentage": round(weather_impact_percentage, 1)
         }
 
-    # Identify significant weather events
-    significant_events = []
-
-    for day in next_30_days:
-        if day["production_factor"] < 0.3:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            significant_events.append({
-                "date": day["date"],
-                "day": date_obj.strftime("%A"),
-                "weather": day["weather"],
-                "production_factor": round(day["production_factor"] * 100, 1),
-                "impact": "severe"
-            })
-        elif day["production_factor"] < 0.5:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            significant_events.append({
-                "date": day["date"],
-                "day": date_obj.strftime("%A"),
-                "weather": day["weather"],
-                "production_factor": round(day["production_factor"] * 100, 1),
-                "impact": "moderate"
-            })
+    # Identify significant weather events (moderate below 50%, severe below 30%)
+    event_idx = np.flatnonzero(production_factor < 0.5)
+    event_factors = production_factor[event_idx]
+    event_days = [daily[i] for i in event_idx.tolist()]
+    day_names = pd.to_datetime([day["date"] for day in event_days], format="%Y-%m-%d").day_name()
+    significant_events = [
+        {
+            "date": day["date"],
+            "day": day_name,
+            "weather": day["weather"],
+            "production_factor": factor,
+            "impact": severity
+        }
+        for day, day_name, factor, severity in zip(
+            event_days,
+            day_names,
+            np.round(event_factors * 100, 1).tolist(),
+            np.where(event_factors < 0.3, "severe", "moderate").tolist()
+        )
+    ]
 
     return {
         "total_expected_kwh_30days": round(total_expected_kwh, 1),
@@ -317,36 +351,18 @@ def analyze_weather_impact(
         "system_capacity_kw": system_capacity_kw
     }
 
-def get_current_season(lat: float) -> str:
+def get_current_season(lat: float, month: Optional[int] = None) -> str:
     """
     Get the current season based on latitude and date.
 
     Args:
         lat: Latitude
+        month: Month number (1-12), defaults to the current month
 
     Returns:
         Current season name
     """
-    now = datetime.now()
-    month = now.month
-
-    # Northern hemisphere
-    if lat >= 0:
-        if 3 <= month <= 5:
-            return "spring"
-        elif 6 <= month <= 8:
-            return "summer"
-        elif 9 <= month <= 11:
-            return "fall"
-        else:
-            return "winter"
-    # Southern hemisphere
-    else:
-        if 3 <= month <= 5:
-            return "fall"
-        elif 6 <= month <= 8:
-            return "winter"
-        elif 9 <= month <= 11:
-            return "spring"
-        else:
-            return "summer"
+    if month is None:
+        month = datetime.now().month
+    seasons = _NORTHERN_SEASONS if lat >= 0 else _SOUTHERN_SEASONS
+    return seasons[month - 1]
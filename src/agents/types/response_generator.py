@@ -3,23 +3,32 @@ Response Generator Agent for Solar Sage.
 
 This agent is responsible for generating responses based on context and query.
 """
+import uuid
 from agents.base_agent import BaseAgent
+from agents.memory_system import MemorySystem
 from rag.prompts.template_loader import load_structured_prompt, render_prompt
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 
 class ResponseGeneratorAgent(BaseAgent):
     """Agent responsible for generating responses."""
 
-    def __init__(self):
-        """Initialize the response generator agent."""
+    def __init__(self, memory_system: Optional[MemorySystem] = None):
+        """
+        Initialize the response generator agent.
+
+        Args:
+            memory_system: Optional memory system used to persist partial
+                transcripts while streaming
+        """
         super().__init__(
             name="ResponseGenerator",
             description="Generates responses based on context and query"
         )
+        self.memory_system = memory_system
 
-    def generate_response(self, query: str, context: List[str], notes: Optional[List[str]] = None) -> str:
+    def _build_prompt(self, query: str, context: List[str], notes: Optional[List[str]] = None) -> str:
         """
-        Generate response based on query and context.
+        Build the response prompt from query, context and notes.
 
         Args:
             query: User query
@@ -27,7 +36,7 @@ class ResponseGeneratorAgent(BaseAgent):
             notes: Optional notes or insights to include
 
         Returns:
-            Generated response
+            Rendered prompt
         """
         # Load prompt template
         config, prompt_template = load_structured_prompt("dual_agent_rag")
@@ -50,10 +59,67 @@ class ResponseGeneratorAgent(BaseAgent):
         if notes_str:
             prompt_vars["notes"] = notes_str
 
-        prompt = render_prompt(prompt_template, prompt_vars)
+        return render_prompt(prompt_template, prompt_vars)
+
+    def generate_response(self, query: str, context: List[str], notes: Optional[List[str]] = None) -> str:
+        """
+        Generate response based on query and context.
+
+        Args:
+            query: User query
+            context: Retrieved context documents
+            notes: Optional notes or insights to include
 
+        Returns:
+            Generated response
+        """
         # Generate response using existing LLM
-        return self.llm.generate(prompt)
+        return self.llm.generate(self._build_prompt(query, context, notes))
+
+    def warm_up(self) -> None:
+        """
+        Prime the LLM's prefix cache with the static part of the prompt.
+
+        The prompt template puts its fixed instructions first, so one short
+        generation lets later requests skip prefilling them.
+        """
+        self.llm.generate(self._build_prompt("", []), max_new_tokens=1)
+
+    def generate_response_stream(
+        self,
+        query: str,
+        context: List[str],
+        notes: Optional[List[str]] = None,
+        user_id: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate a response incrementally, yielding chunks as the LLM produces them.
+
+        If a memory system and user are given, each chunk is also appended to
+        the user's transcript as a message_update record, followed by a final
+        message_complete record.
+
+        Args:
+            query: User query
+            context: Retrieved context documents
+            notes: Optional notes or insights to include
+            user_id: Optional user whose transcript receives partial output
+
+        Yields:
+            Response text chunks
+        """
+        chunks = self.llm.stream(self._build_prompt(query, context, notes))
+
+        if self.memory_system is None or user_id is None:
+            yield from chunks
+            return
+
+        message_id = uuid.uuid4().hex
+        with self.memory_system.transcript_writer(user_id) as write:
+            for chunk in chunks:
+                write({"type": "message_update", "id": message_id, "delta": chunk})
+                yield chunk
+            write({"type": "message_complete", "id": message_id})
 
     def run(self, query: str, context: List[str], notes: Optional[List[str]] = None) -> str:
         """
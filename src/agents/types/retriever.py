@@ -3,6 +3,7 @@ Retriever Agent for Solar Sage.
 
 This agent is responsible for retrieving relevant context for user queries.
 """
+from fastapi.concurrency import run_in_threadpool
 from agents.base_agent import BaseAgent
 from retrieval.providers.lancedb import get_context_documents
 from typing import List, Dict, Any, Optional
@@ -30,6 +31,19 @@ class RetrieverAgent(BaseAgent):
         """
         return get_context_documents(query, n_results=max_documents)
 
+    async def afetch_context(self, query: str, max_documents: int = 5) -> List[str]:
+        """
+        Fetch relevant context for the query in a worker thread.
+
+        Args:
+            query: User query
+            max_documents: Maximum number of documents to retrieve
+
+        Returns:
+            List of relevant document chunks
+        """
+        return await run_in_threadpool(get_context_documents, query, n_results=max_documents)
+
     def run(self, query: str, max_documents: int = 5) -> List[str]:
         """
         Run the retriever agent.
@@ -1,33 +1,91 @@
 import os
-import requests
-from dotenv import load_dotenv
+import threading
+import httpx
 from typing import Dict, Any
+from urllib.parse import quote
 
-load_dotenv()
+from core.config import load_env_file
+
+load_env_file()
 
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
 BASE_URL = "https://api.openweathermap.org/data/3.0/onecall"
 
+# Request URL with the fixed query parameters already encoded;
+# exclude parts we don't use to save bandwidth
+_URL_TEMPLATE = (
+    BASE_URL + "?lat={lat}&lon={lon}&appid=" + quote(OPENWEATHER_API_KEY or "", safe="")
+    + "&units={units}&exclude=minutely"
+)
+
+# Shared clients keep connections to the weather API alive between calls.
+# They are created on first use and again after aclose_clients(), so the app
+# can be started and shut down more than once in a process.
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(timeout=10.0, limits=_LIMITS)
+        return _client
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    # Only called from the event loop, so no lock is needed
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(timeout=10.0, limits=_LIMITS)
+    return _async_client
+
+
+def _missing_api_key(lat: float, lon: float, units: str) -> str:
+    raise ValueError("Missing OpenWeather API key. Set OPENWEATHER_API_KEY in your .env file.")
+
+
+# The API key is checked once here rather than on every request
+_build_url = _URL_TEMPLATE.format if OPENWEATHER_API_KEY else _missing_api_key
+
 
 def fetch_weather(lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
     """
     Fetch weather data from OpenWeather One Call API 3.0
     """
-    if not OPENWEATHER_API_KEY:
-        raise ValueError("Missing OpenWeather API key. Set OPENWEATHER_API_KEY in your .env file.")
+    url = _build_url(lat=lat, lon=lon, units=units)
 
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "appid": OPENWEATHER_API_KEY,
-        "units": units,
-        "exclude": "minutely"  # optional: exclude parts to save bandwidth
-    }
+    try:
+        response = _get_client().get(url)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"Weather API call failed: {e}")
+
+
+async def afetch_weather(lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
+    """
+    Fetch weather data from OpenWeather One Call API 3.0 without blocking the event loop
+    """
+    url = _build_url(lat=lat, lon=lon, units=units)
 
     try:
-        response = requests.get(BASE_URL, params=params)
+        response = await _get_async_client().get(url)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise RuntimeError(f"Weather API call failed: {e}")
+
+
+async def aclose_clients() -> None:
+    """
+    Close the shared weather API clients; the next request opens new ones
+    """
+    if _async_client is not None:
+        await _async_client.aclose()
+    with _client_lock:
+        if _client is not None:
+            _client.close()
@@ -5,9 +5,14 @@ This module provides the main FastAPI application for Solar Sage.
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from core.config import get_config
 from core.logging import get_logger
 from api.routes.solar_forecasting import router as solar_router
+from agents.types.weather import aclose_clients as close_weather_clients
+from llm.base import uses_ollama
+from llm.ollama_llm import close_client as close_ollama_client
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -16,7 +21,8 @@ logger = get_logger(__name__)
 app = FastAPI(
     title="Solar Sage API",
     description="API for Solar Sage, a solar energy assistant with RAG capabilities",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -28,9 +34,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (forecast payloads are several KB of JSON)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(solar_router)
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close shared HTTP clients."""
+    await close_weather_clients()
+    close_ollama_client()
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -46,10 +61,16 @@ async def health():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     
     host = get_config("api_host", "0.0.0.0")
     port = int(get_config("api_port", 8000))
+    # Each worker process loads its own copy of an in-process (Transformers) model
+    default_workers = (os.cpu_count() or 1) if uses_ollama() else 1
+    workers = int(get_config("api_workers") or default_workers)
     
-    logger.info(f"Starting Solar Sage API on {host}:{port}")
-    uvicorn.run(app, host=host, port=port)
+    logger.info(f"Starting Solar Sage API on {host}:{port} with {workers} workers")
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard])
+    uvicorn.run("api.main:app", host=host, port=port, workers=workers,
+                loop="auto", http="auto")
@@ -3,15 +3,18 @@ Solar Forecasting API routes for Solar Sage.
 
 This module provides API endpoints for solar energy forecasting.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, Query, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 
 from agents.integrations.solar_forecasting import (
     get_solar_demand_forecast,
     get_cost_savings_analysis
 )
-from rag.engines.solar_enhanced import solar_enhanced_rag_answer
+from agents.integrations.weather import prefetch_weather_for_location
+from rag.engines.solar_enhanced import asolar_enhanced_rag_answer
 
 router = APIRouter(
     prefix="/solar",
@@ -19,9 +22,14 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Request models are immutable and ignore unknown fields
+REQUEST_MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
 class SolarForecastRequest(BaseModel):
     """Request model for solar forecast."""
     
+    model_config = REQUEST_MODEL_CONFIG
+
     latitude: float = Field(..., description="Latitude of the location")
     longitude: float = Field(..., description="Longitude of the location")
     location_id: str = Field(..., description="Identifier for the location")
@@ -32,6 +40,8 @@ class SolarForecastRequest(BaseModel):
 class SolarRagRequest(BaseModel):
     """Request model for solar-enhanced RAG."""
     
+    model_config = REQUEST_MODEL_CONFIG
+
     query: str = Field(..., description="User query")
     latitude: float = Field(..., description="Latitude of the location")
     longitude: float = Field(..., description="Longitude of the location")
@@ -42,8 +52,29 @@ class SolarRagRequest(BaseModel):
     include_weather: bool = Field(True, description="Whether to include weather context")
     include_solar_forecast: bool = Field(True, description="Whether to include solar forecast")
 
-@router.post("/forecast")
-async def solar_forecast(request: SolarForecastRequest) -> Dict[str, Any]:
+# The forecast and cost-savings endpoints return ORJSONResponse directly: their
+# payloads are large plain dicts, so the response models only document them in
+# OpenAPI and the per-field validation and encoding are skipped
+class SolarForecastResponse(BaseModel):
+    """Response model for solar forecast."""
+
+    forecast: Dict[str, Any] = Field(..., description="Solar energy demand forecast")
+
+class CostSavingsResponse(BaseModel):
+    """Response model for cost savings analysis."""
+
+    cost_savings: Dict[str, Any] = Field(..., description="Cost savings analysis")
+
+class SolarRagResponse(BaseModel):
+    """Response model for solar-enhanced RAG."""
+
+    response: str = Field(..., description="Generated answer")
+    has_weather_context: bool = Field(False, description="Whether weather context was used")
+    weather_summary: Optional[List[str]] = Field(None, description="Weather context status messages")
+    solar_forecast: Optional[Dict[str, Any]] = Field(None, description="Solar forecast and cost savings data")
+
+@router.post("/forecast", response_model=SolarForecastResponse)
+async def solar_forecast(request: SolarForecastRequest) -> ORJSONResponse:
     """
     Get a solar energy demand forecast.
     
@@ -53,20 +84,23 @@ async def solar_forecast(request: SolarForecastRequest) -> Dict[str, Any]:
     Returns:
         Solar energy demand forecast
     """
+    await prefetch_weather_for_location(request.latitude, request.longitude)
+
     try:
-        forecast = get_solar_demand_forecast(
+        forecast = await run_in_threadpool(
+            get_solar_demand_forecast,
             request.latitude,
             request.longitude,
             request.location_id,
             request.system_capacity_kw
         )
         
-        return {"forecast": forecast}
+        return ORJSONResponse({"forecast": forecast})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating forecast: {str(e)}")
 
-@router.post("/cost-savings")
-async def cost_savings(request: SolarForecastRequest) -> Dict[str, Any]:
+@router.post("/cost-savings", response_model=CostSavingsResponse)
+async def cost_savings(request: SolarForecastRequest) -> ORJSONResponse:
     """
     Get a cost savings analysis for a solar system.
     
@@ -79,8 +113,11 @@ async def cost_savings(request: SolarForecastRequest) -> Dict[str, Any]:
     if request.electricity_rate is None:
         raise HTTPException(status_code=400, detail="Electricity rate is required")
     
+    await prefetch_weather_for_location(request.latitude, request.longitude)
+
     try:
-        cost_savings = get_cost_savings_analysis(
+        cost_savings = await run_in_threadpool(
+            get_cost_savings_analysis,
             request.latitude,
             request.longitude,
             request.location_id,
@@ -89,11 +126,11 @@ async def cost_savings(request: SolarForecastRequest) -> Dict[str, Any]:
             request.feed_in_tariff
         )
         
-        return {"cost_savings": cost_savings}
+        return ORJSONResponse({"cost_savings": cost_savings})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating cost savings analysis: {str(e)}")
 
-@router.post("/rag")
+@router.post("/rag", response_model=SolarRagResponse, response_model_exclude_unset=True)
 async def solar_rag(request: SolarRagRequest) -> Dict[str, Any]:
     """
     Get a solar-enhanced RAG response.
@@ -105,7 +142,7 @@ async def solar_rag(request: SolarRagRequest) -> Dict[str, Any]:
         Solar-enhanced RAG response
     """
     try:
-        response = solar_enhanced_rag_answer(
+        response = await asolar_enhanced_rag_answer(
             user_query=request.query,
             lat=request.latitude,
             lon=request.longitude,
@@ -121,13 +158,13 @@ async def solar_rag(request: SolarRagRequest) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating RAG response: {str(e)}")
 
-@router.get("/forecast")
+@router.get("/forecast", response_model=SolarForecastResponse)
 async def get_solar_forecast(
     latitude: float = Query(..., description="Latitude of the location"),
     longitude: float = Query(..., description="Longitude of the location"),
     location_id: str = Query(..., description="Identifier for the location"),
     system_capacity_kw: float = Query(..., description="Capacity of the solar system in kW")
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """
     Get a solar energy demand forecast.
     
@@ -140,19 +177,22 @@ async def get_solar_forecast(
     Returns:
         Solar energy demand forecast
     """
+    await prefetch_weather_for_location(latitude, longitude)
+
     try:
-        forecast = get_solar_demand_forecast(
+        forecast = await run_in_threadpool(
+            get_solar_demand_forecast,
             latitude,
             longitude,
             location_id,
             system_capacity_kw
         )
         
-        return {"forecast": forecast}
+        return ORJSONResponse({"forecast": forecast})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating forecast: {str(e)}")
 
-@router.get("/cost-savings")
+@router.get("/cost-savings", response_model=CostSavingsResponse)
 async def get_cost_savings(
     latitude: float = Query(..., description="Latitude of the location"),
     longitude: float = Query(..., description="Longitude of the location"),
@@ -160,7 +200,7 @@ async def get_cost_savings(
     system_capacity_kw: float = Query(..., description="Capacity of the solar system in kW"),
     electricity_rate: float = Query(..., description="Electricity rate in currency per kWh"),
     feed_in_tariff: Optional[float] = Query(None, description="Feed-in tariff for excess energy in currency per kWh")
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """
     Get a cost savings analysis for a solar system.
     
@@ -175,8 +215,11 @@ async def get_cost_savings(
     Returns:
         Cost savings analysis
     """
+    await prefetch_weather_for_location(latitude, longitude)
+
     try:
-        cost_savings = get_cost_savings_analysis(
+        cost_savings = await run_in_threadpool(
+            get_cost_savings_analysis,
             latitude,
             longitude,
             location_id,
@@ -185,11 +228,11 @@ async def get_cost_savings(
             feed_in_tariff
         )
         
-        return {"cost_savings": cost_savings}
+        return ORJSONResponse({"cost_savings": cost_savings})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating cost savings analysis: {str(e)}")
 
-@router.get("/rag")
+@router.get("/rag", response_model=SolarRagResponse, response_model_exclude_unset=True)
 async def get_solar_rag(
     query: str = Query(..., description="User query"),
     latitude: float = Query(..., description="Latitude of the location"),
@@ -219,7 +262,7 @@ async def get_solar_rag(
         Solar-enhanced RAG response
     """
     try:
-        response = solar_enhanced_rag_answer(
+        response = await asolar_enhanced_rag_answer(
             user_query=query,
             lat=latitude,
             lon=longitude,
@@ -3,11 +3,19 @@ Chat API endpoints for Solar Sage.
 
 This module implements FastAPI endpoints for chat interactions.
 """
+import asyncio
+import json
+import re
+import time
+from datetime import date
 from fastapi import APIRouter, HTTPException
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from app.models.prompt import ChatRequest, ChatResponse
-from rag.engines.base import rag_answer
+from llm.base import is_llm_error
+from rag.engines.base import rag_answer, enhanced_rag_answer_stream
 from core.logging import get_logger
 
 # Set up logging
@@ -16,6 +24,7 @@ logger = get_logger(__name__)
 # Import weather-enhanced RAG if available, otherwise use a fallback
 try:
     from rag.engines.weather_enhanced import weather_enhanced_rag_answer, is_weather_related_query
+    from rag.engines.weather_enhanced import weather_enhanced_rag_answer_stream
     WEATHER_RAG_AVAILABLE = True
 except ImportError:
     WEATHER_RAG_AVAILABLE = False
@@ -36,28 +45,34 @@ except ImportError:
 try:
     from rag.engines.solar_enhanced import solar_enhanced_rag_answer
     from rag.engines.solar_enhanced import format_solar_forecast_context
+    from rag.engines.solar_enhanced import solar_enhanced_rag_answer_stream
     SOLAR_RAG_AVAILABLE = True
 
+    # Keywords that mark a query as forecast-related, matched anywhere in the
+    # query (case-insensitive) by a single precompiled alternation
+    FORECAST_KEYWORDS = [
+        "forecast", "predict", "production", "output", "generate",
+        "kwh", "kilowatt", "energy", "power", "electricity",
+        "bill", "cost", "save", "saving", "savings",
+        "roi", "return", "investment", "payback", "break even",
+        "efficiency", "performance", "expect", "prediction"
+    ]
+    _FORECAST_KEYWORDS_RE = re.compile(
+        "|".join(map(re.escape, FORECAST_KEYWORDS)), re.IGNORECASE
+    )
+    # Single-word keywords, checked first against the query's words by hashing
+    _FORECAST_KEYWORD_TOKENS = frozenset(
+        keyword for keyword in FORECAST_KEYWORDS if " " not in keyword
+    )
+
     def is_solar_forecast_related_query(query: str) -> bool:
         """
         Determine if a query is related to solar forecasting and production.
         """
-        forecast_keywords = [
-            "forecast", "predict", "production", "output", "generate",
-            "kwh", "kilowatt", "energy", "power", "electricity",
-            "bill", "cost", "save", "saving", "savings",
-            "roi", "return", "investment", "payback", "break even",
-            "efficiency", "performance", "expect", "prediction"
-        ]
-
-        query_lower = query.lower()
-
-        # Check for forecast-related keywords
-        for keyword in forecast_keywords:
-            if keyword in query_lower:
-                return True
-
-        return False
+        if not _FORECAST_KEYWORD_TOKENS.isdisjoint(query.lower().split()):
+            return True
+        # Phrases, punctuated words and keywords inside longer words
+        return _FORECAST_KEYWORDS_RE.search(query) is not None
 except ImportError:
     SOLAR_RAG_AVAILABLE = False
 
@@ -75,9 +90,312 @@ except ImportError:
             "solar_summary": []
         }
 
+# Streamed responses send the first chunk on its own for a fast first token,
+# then batch chunks in groups growing by STREAM_BATCH_GROWTH up to STREAM_MAX_BATCH
+STREAM_MAX_BATCH = 50
+STREAM_BATCH_GROWTH = 2
+
+# Cache of chat responses keyed on the normalized request (see _response_cache_key)
+RESPONSE_CACHE_TTL_SECONDS = 300
+RESPONSE_CACHE_MAXSIZE = 512
+_response_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+
+# Requests being answered, keyed like the response cache, so identical
+# concurrent requests wait for one RAG run instead of starting their own
+_inflight: Dict[Tuple, "asyncio.Future[Dict[str, Any]]"] = {}
+
+# RAG pipelines a chat request can be routed to
+ROUTE_SOLAR = "solar"
+ROUTE_WEATHER = "weather"
+ROUTE_STANDARD = "standard"
+
+# Short queries and definition-style lookups ("what is an inverter?") are
+# never routed to solar-enhanced RAG on keywords alone; an explicit solar
+# forecast request still is
+SHORT_QUERY_MAX_TOKENS = 8
+LOOKUP_QUERY_MAX_CHARS = 40
+_LOOKUP_QUERY_RE = re.compile(r"^(what is|what are|define|who)\b", re.IGNORECASE)
+
+# Coordinates are rounded to this many decimals (about 1 km) before use, so
+# nearby users share weather lookups, cached responses and prompt prefixes
+COORDINATE_PRECISION = 2
+
 router = APIRouter()
 
-@router.post("/sage", response_model=ChatResponse)
+def clear_response_cache() -> None:
+    """Clear cached chat responses."""
+    _response_cache.clear()
+
+def _round_coordinate(value: Optional[float]) -> Optional[float]:
+    """Round a latitude or longitude to COORDINATE_PRECISION decimals."""
+    return None if value is None else round(value, COORDINATE_PRECISION)
+
+def _response_cache_key(request: ChatRequest) -> Tuple:
+    """
+    Build the response cache key for a chat request.
+
+    Queries are compared case- and whitespace-insensitively and coordinates
+    are rounded with _round_coordinate. Requests for a solar forecast
+    also include today's date so cached answers never outlive the forecast
+    horizon.
+
+    Args:
+        request: Chat request
+
+    Returns:
+        Hashable cache key
+    """
+    return (
+        " ".join(request.query.lower().split()),
+        _round_coordinate(request.lat),
+        _round_coordinate(request.lon),
+        request.include_weather,
+        request.include_solar_forecast,
+        request.location_id,
+        request.system_capacity_kw,
+        request.electricity_rate,
+        request.feed_in_tariff,
+        date.today().isoformat() if request.include_solar_forecast else None
+    )
+
+def _get_cached_response(key: Tuple) -> Optional[Dict[str, Any]]:
+    """Get a cached response if it has not expired, marking it recently used."""
+    entry = _response_cache.pop(key, None)
+    if entry is None or time.monotonic() - entry[0] >= RESPONSE_CACHE_TTL_SECONDS:
+        return None
+    # Re-inserting moves the key to the end
+    _response_cache[key] = entry
+    return entry[1]
+
+def _response_payload(answer: str, result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a ChatResponse-shaped payload from a RAG answer and its metadata.
+
+    Args:
+        answer: Generated response
+        result: Optional RAG result with context metadata
+
+    Returns:
+        Dictionary with every ChatResponse field
+    """
+    result = result or {}
+    return {
+        "response": answer,
+        "has_weather_context": result.get("has_weather_context", False),
+        "weather_summary": result.get("weather_summary", None),
+        "has_solar_forecast": result.get("has_solar_forecast", False),
+        "solar_summary": result.get("solar_summary", None)
+    }
+
+def _store_response(key: Tuple, payload: Dict[str, Any]) -> ORJSONResponse:
+    """
+    Cache a response payload, evicting the least recently used entry when full.
+
+    LLM error responses are returned but not cached, so a brief backend
+    outage is not served to identical queries for the whole TTL.
+
+    The payload is serialized directly with orjson instead of being built
+    into a ChatResponse and validated against the response_model (which is
+    still used for the OpenAPI schema).
+    """
+    if is_llm_error(payload["response"]):
+        return ORJSONResponse(payload)
+    if len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+        del _response_cache[next(iter(_response_cache))]
+    _response_cache[key] = (time.monotonic(), payload)
+    return ORJSONResponse(payload)
+
+def _requested_context(request: ChatRequest) -> Tuple[bool, bool]:
+    """
+    Check which context a chat request explicitly asks for.
+
+    Args:
+        request: Chat request
+
+    Returns:
+        Tuple of (use_weather, use_solar)
+    """
+    has_location = request.lat is not None and request.lon is not None
+    use_weather = request.include_weather and has_location
+    use_solar = (
+        request.include_solar_forecast and has_location and
+        request.location_id is not None and
+        request.system_capacity_kw is not None
+    )
+    return use_weather, use_solar
+
+def _is_simple_lookup(query: str) -> bool:
+    """Check if a query is short or a definition-style catalog lookup."""
+    if len(query.split()) < SHORT_QUERY_MAX_TOKENS:
+        return True
+    return len(query) < LOOKUP_QUERY_MAX_CHARS and _LOOKUP_QUERY_RE.match(query) is not None
+
+def _select_route(query: str, use_weather: bool, use_solar: bool) -> str:
+    """
+    Pick the RAG pipeline for a query.
+
+    Solar-enhanced RAG wins if requested or the query is forecast-related
+    (simple lookups are never treated as forecast-related), then
+    weather-enhanced RAG if requested or the query is weather-related.
+    Pipelines that failed to import are never selected.
+
+    Args:
+        query: User query
+        use_weather: Whether weather context was requested
+        use_solar: Whether a solar forecast was requested
+
+    Returns:
+        One of ROUTE_SOLAR, ROUTE_WEATHER or ROUTE_STANDARD
+    """
+    if SOLAR_RAG_AVAILABLE and (use_solar or (
+            not _is_simple_lookup(query) and is_solar_forecast_related_query(query))):
+        return ROUTE_SOLAR
+    if WEATHER_RAG_AVAILABLE and (use_weather or is_weather_related_query(query)):
+        return ROUTE_WEATHER
+    return ROUTE_STANDARD
+
+def _sse(data: Any, event: Optional[str] = None) -> str:
+    """Format a server-sent event with a JSON payload."""
+    message = f"data: {json.dumps(data)}\n\n"
+    return f"event: {event}\n{message}" if event else message
+
+def _batch_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Join response chunks into growing batches to reduce framing overhead."""
+    batch: List[str] = []
+    batch_size = 1
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield "".join(batch)
+            batch = []
+            batch_size = min(batch_size * STREAM_BATCH_GROWTH, STREAM_MAX_BATCH)
+    if batch:
+        yield "".join(batch)
+
+def _event_stream(request: ChatRequest, use_weather: bool, use_solar: bool) -> Iterator[str]:
+    """
+    Run the RAG pipeline for a request and stream its answer as server-sent events.
+
+    Yields a "metadata" event with the ChatResponse flags, unnamed events with
+    response text, and a final "done" event. Errors after the stream has
+    started are reported as an "error" event.
+
+    Args:
+        request: Chat request
+        use_weather: Whether weather context was requested
+        use_solar: Whether a solar forecast was requested
+
+    Yields:
+        Server-sent event strings
+    """
+    try:
+        route = _select_route(request.query, use_weather, use_solar)
+
+        if route == ROUTE_SOLAR:
+            logger.info("Streaming solar-enhanced RAG")
+            result = solar_enhanced_rag_answer_stream(
+                user_query=request.query,
+                lat=_round_coordinate(request.lat),
+                lon=_round_coordinate(request.lon),
+                location_id=request.location_id,
+                system_capacity_kw=request.system_capacity_kw,
+                electricity_rate=request.electricity_rate,
+                feed_in_tariff=request.feed_in_tariff,
+                include_weather=use_weather,
+                include_solar_forecast=True,
+                user_id=request.user_id
+            )
+        elif route == ROUTE_WEATHER:
+            logger.info("Streaming weather-enhanced RAG")
+            result = weather_enhanced_rag_answer_stream(
+                user_query=request.query,
+                lat=_round_coordinate(request.lat),
+                lon=_round_coordinate(request.lon),
+                include_weather=True,
+                user_id=request.user_id
+            )
+        else:
+            logger.info("Streaming standard RAG")
+            result = enhanced_rag_answer_stream(request.query, user_id=request.user_id)
+
+        yield _sse({
+            "has_weather_context": result.get("has_weather_context", False),
+            "weather_summary": result.get("weather_summary", None),
+            "has_solar_forecast": result.get("has_solar_forecast", False),
+            "solar_summary": result.get("solar_summary", None)
+        }, event="metadata")
+
+        for text in _batch_chunks(result["response_stream"]):
+            yield _sse(text)
+
+        yield _sse(None, event="done")
+    except Exception as e:
+        logger.exception("Error in streamed RAG")
+        yield _sse({"detail": str(e)}, event="error")
+
+async def _answer(request: ChatRequest, use_weather: bool, use_solar: bool) -> Dict[str, Any]:
+    """
+    Answer a chat request with the RAG pipeline it routes to.
+
+    Args:
+        request: Chat request
+        use_weather: Whether weather context was requested
+        use_solar: Whether a solar forecast was requested
+
+    Returns:
+        ChatResponse-shaped payload
+    """
+    route = _select_route(request.query, use_weather, use_solar)
+
+    # Use solar-enhanced RAG if requested or if query is solar forecast-related
+    if route == ROUTE_SOLAR:
+        logger.info("Using solar-enhanced RAG")
+        try:
+            result = await run_in_threadpool(
+                solar_enhanced_rag_answer,
+                user_query=request.query,
+                lat=_round_coordinate(request.lat),
+                lon=_round_coordinate(request.lon),
+                location_id=request.location_id,
+                system_capacity_kw=request.system_capacity_kw,
+                electricity_rate=request.electricity_rate,
+                feed_in_tariff=request.feed_in_tariff,
+                include_weather=use_weather,
+                include_solar_forecast=True
+            )
+            logger.info("Solar-enhanced RAG completed successfully")
+            return _response_payload(result["response"], result)
+        except Exception as e:
+            logger.exception("Error in solar-enhanced RAG")
+            raise HTTPException(status_code=500, detail=f"Error in solar-enhanced RAG: {str(e)}")
+    # Use weather-enhanced RAG if requested or if query is weather-related
+    elif route == ROUTE_WEATHER:
+        logger.info("Using weather-enhanced RAG")
+        try:
+            result = await run_in_threadpool(
+                weather_enhanced_rag_answer,
+                user_query=request.query,
+                lat=_round_coordinate(request.lat),
+                lon=_round_coordinate(request.lon),
+                include_weather=True
+            )
+            logger.info("Weather-enhanced RAG completed successfully")
+            return _response_payload(result["response"], result)
+        except Exception as e:
+            logger.exception("Error in weather-enhanced RAG")
+            raise HTTPException(status_code=500, detail=f"Error in weather-enhanced RAG: {str(e)}")
+    else:
+        # Use standard RAG for non-weather, non-solar queries
+        logger.info("Using standard RAG")
+        try:
+            answer = await run_in_threadpool(rag_answer, request.query)
+            logger.info("Standard RAG completed successfully")
+            return _response_payload(answer)
+        except Exception as e:
+            logger.exception("Error in standard RAG")
+            raise HTTPException(status_code=500, detail=f"Error in standard RAG: {str(e)}")
+
+@router.post("/sage", response_model=ChatResponse, response_class=ORJSONResponse)
 async def sage(request: ChatRequest):
     """
     Process a chat request and return a response.
@@ -86,112 +404,47 @@ async def sage(request: ChatRequest):
     use the weather-enhanced RAG system.
 
     If solar forecast data is relevant, use the solar-enhanced RAG system.
+
+    If stream is set, the answer is sent as server-sent events instead.
     """
     try:
-        logger.info(f"Received chat request: {request}")
-
-        # Check if we should use weather-enhanced RAG
-        use_weather = (
-            hasattr(request, 'include_weather') and
-            request.include_weather and
-            hasattr(request, 'lat') and
-            request.lat is not None and
-            hasattr(request, 'lon') and
-            request.lon is not None
-        )
+        logger.debug("Received chat request: %r", request)
 
-        # Check if we should use solar-enhanced RAG
-        use_solar = (
-            hasattr(request, 'include_solar_forecast') and
-            request.include_solar_forecast and
-            hasattr(request, 'lat') and
-            request.lat is not None and
-            hasattr(request, 'lon') and
-            request.lon is not None and
-            hasattr(request, 'location_id') and
-            request.location_id is not None and
-            hasattr(request, 'system_capacity_kw') and
-            request.system_capacity_kw is not None
+        use_weather, use_solar = _requested_context(request)
+
+        logger.debug(
+            "Use weather: %s, use solar: %s (WEATHER_RAG_AVAILABLE: %s, SOLAR_RAG_AVAILABLE: %s)",
+            use_weather, use_solar, WEATHER_RAG_AVAILABLE, SOLAR_RAG_AVAILABLE
         )
+        logger.debug("Query: %s, location: lat=%s, lon=%s", request.query, request.lat, request.lon)
+
+        # Stream the answer as server-sent events if requested; Starlette
+        # iterates the synchronous generator in its threadpool
+        if request.stream:
+            return StreamingResponse(
+                _event_stream(request, use_weather, use_solar),
+                media_type="text/event-stream"
+            )
 
-        logger.info(f"Use weather: {use_weather}")
-        logger.info(f"Use solar: {use_solar}")
-        logger.info(f"WEATHER_RAG_AVAILABLE: {WEATHER_RAG_AVAILABLE}")
-        logger.info(f"SOLAR_RAG_AVAILABLE: {SOLAR_RAG_AVAILABLE}")
-        logger.info(f"Query: {request.query}")
-
-        if hasattr(request, 'lat') and hasattr(request, 'lon'):
-            logger.info(f"Location: lat={request.lat}, lon={request.lon}")
-
-        # Use solar-enhanced RAG if requested or if query is solar forecast-related
-        if SOLAR_RAG_AVAILABLE and (use_solar or is_solar_forecast_related_query(request.query)):
-            logger.info("Using solar-enhanced RAG")
-            try:
-                result = solar_enhanced_rag_answer(
-                    user_query=request.query,
-                    lat=request.lat if hasattr(request, 'lat') else None,
-                    lon=request.lon if hasattr(request, 'lon') else None,
-                    location_id=request.location_id if hasattr(request, 'location_id') else None,
-                    system_capacity_kw=request.system_capacity_kw if hasattr(request, 'system_capacity_kw') else None,
-                    electricity_rate=request.electricity_rate if hasattr(request, 'electricity_rate') else None,
-                    feed_in_tariff=request.feed_in_tariff if hasattr(request, 'feed_in_tariff') else None,
-                    include_weather=use_weather,
-                    include_solar_forecast=True
-                )
-                logger.info("Solar-enhanced RAG completed successfully")
-                return ChatResponse(
-                    response=result["response"],
-                    has_weather_context=result.get("has_weather_context", False),
-                    weather_summary=result.get("weather_summary", None),
-                    has_solar_forecast=result.get("has_solar_forecast", False),
-                    solar_summary=result.get("solar_summary", None)
-                )
-            except Exception as e:
-                logger.error(f"Error in solar-enhanced RAG: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                raise HTTPException(status_code=500, detail=f"Error in solar-enhanced RAG: {str(e)}")
-        # Use weather-enhanced RAG if requested or if query is weather-related
-        elif WEATHER_RAG_AVAILABLE and (use_weather or is_weather_related_query(request.query)):
-            logger.info("Using weather-enhanced RAG")
-            try:
-                result = weather_enhanced_rag_answer(
-                    user_query=request.query,
-                    lat=request.lat if hasattr(request, 'lat') else None,
-                    lon=request.lon if hasattr(request, 'lon') else None,
-                    include_weather=True
-                )
-                logger.info("Weather-enhanced RAG completed successfully")
-                return ChatResponse(
-                    response=result["response"],
-                    has_weather_context=result["has_weather_context"],
-                    weather_summary=result["weather_summary"]
-                )
-            except Exception as e:
-                logger.error(f"Error in weather-enhanced RAG: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                raise HTTPException(status_code=500, detail=f"Error in weather-enhanced RAG: {str(e)}")
+        # Serve repeated questions from the response cache
+        cache_key = _response_cache_key(request)
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            logger.info("Serving cached response")
+            return ORJSONResponse(cached)
+
+        # Identical requests that are already being answered share that answer
+        task = _inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(_answer(request, use_weather, use_solar))
+            _inflight[cache_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
         else:
-            # Use standard RAG for non-weather, non-solar queries
-            logger.info("Using standard RAG")
-            try:
-                answer = rag_answer(request.query)
-                logger.info("Standard RAG completed successfully")
-                return ChatResponse(
-                    response=answer,
-                    has_weather_context=False,
-                    has_solar_forecast=False
-                )
-            except Exception as e:
-                logger.error(f"Error in standard RAG: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                raise HTTPException(status_code=500, detail=f"Error in standard RAG: {str(e)}")
+            logger.info("Joining identical in-flight request")
+
+        return _store_response(cache_key, await asyncio.shield(task))
     except Exception as e:
-        logger.error(f"Unexpected error in chat endpoint: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Unexpected error in chat endpoint")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 # Add a simple GET endpoint for testing
@@ -199,11 +452,6 @@ async def sage(request: ChatRequest):
 async def root():
     return {"message": "Solar Sage API is running"}
 
-# Keep the /chat endpoint for backward compatibility
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """
-    Process a chat request and return a response (for backward compatibility).
-    This endpoint calls the sage endpoint.
-    """
-    return await sage(request)
+# Keep the /chat endpoint for backward compatibility, served by the same handler
+router.add_api_route("/chat", sage, methods=["POST"], response_model=ChatResponse,
+                     response_class=ORJSONResponse)
@@ -1,7 +1,10 @@
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class ChatRequest(BaseModel):
+    # Requests are immutable, and surrounding whitespace is stripped while parsing
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     query: str = Field(..., min_length=5, description="The user's input question.")
     lat: Optional[float] = Field(None, description="Latitude for weather data")
     lon: Optional[float] = Field(None, description="Longitude for weather data")
@@ -11,6 +14,11 @@ class ChatRequest(BaseModel):
     electricity_rate: Optional[float] = Field(None, description="Electricity rate in currency per kWh")
     feed_in_tariff: Optional[float] = Field(None, description="Feed-in tariff for excess energy in currency per kWh")
     include_solar_forecast: bool = Field(False, description="Whether to include solar forecast context")
+    stream: bool = Field(False, description="Whether to stream the response as server-sent events")
+    user_id: Optional[str] = Field(
+        None, pattern=r"^[A-Za-z0-9_.-]{1,64}$",
+        description="User whose transcript records the streamed response"
+    )
 
 class ChatResponse(BaseModel):
     response: str
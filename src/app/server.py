@@ -3,12 +3,20 @@ Main FastAPI server for Solar Sage.
 
 This module sets up the FastAPI application and includes all routes.
 """
+import asyncio
+import os
+import anyio.to_thread
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI
-import uvicorn
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 
 from app.endpoints.chat_endpoints import router as chat_router
 from core.config import get_config
+from rag.engines.base import warm_up_prompt_cache
+from agents.types.weather import aclose_clients as close_weather_clients
+from llm.base import uses_ollama
+from llm.ollama_llm import close_client as close_ollama_client
 from core.logging import get_logger, setup_logging
 
 # Set up logging
@@ -19,12 +27,47 @@ logger = get_logger(__name__)
 app = FastAPI(
     title="Solar Sage API",
     description="API for Solar Sage, an intelligent solar energy assistant",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Include routers
 app.include_router(chat_router)
 
+@app.on_event("startup")
+async def size_threadpool():
+    """Size the threadpool that runs the blocking RAG calls."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(get_config("api_threadpool_size", 40))
+
+@app.on_event("startup")
+async def warm_up():
+    """Prime the LLM prefix cache in the background so startup is not delayed."""
+    # Opt-in: every worker runs it, and it loads the model if none is loaded yet
+    if str(get_config("llm_warm_up", "False")).lower() != "true":
+        return
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-up")
+    app.state.warm_up_executor = executor
+    app.state.warm_up_future = executor.submit(_warm_up_prompt_cache)
+
+def _warm_up_prompt_cache() -> None:
+    try:
+        warm_up_prompt_cache()
+    except Exception as e:
+        logger.warning(f"Prompt cache warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Wait for the warm-up and close shared HTTP clients."""
+    future = getattr(app.state, "warm_up_future", None)
+    if future is not None:
+        # A warm-up that already started still uses the Ollama client
+        if not future.cancel():
+            await asyncio.wrap_future(future)
+        app.state.warm_up_executor.shutdown(wait=False)
+    await close_weather_clients()
+    close_ollama_client()
+
 
 def run_server(host: Optional[str] = None, port: Optional[int] = None) -> None:
     """
@@ -34,11 +77,28 @@ def run_server(host: Optional[str] = None, port: Optional[int] = None) -> None:
         host: Host to run the server on
         port: Port to run the server on
     """
+    # uvicorn is only needed to run the server, not to import the app
+    import uvicorn
+
     # Get configuration
     server_host = host or get_config("api_host", "0.0.0.0")
     server_port = port or int(get_config("api_port", "8000"))
+    reload = str(get_config("debug", "False")).lower() == "true"
+
+    # Reloading only works with a single worker. Every worker is a separate
+    # process that loads its own copy of an in-process (Transformers) model,
+    # so only default to one worker per CPU when the model is served by Ollama.
+    if reload:
+        workers = 1
+    elif get_config("api_workers"):
+        workers = int(get_config("api_workers"))
+    else:
+        workers = (os.cpu_count() or 1) if uses_ollama() else 1
 
-    logger.info(f"Starting API server on {server_host}:{server_port}")
+    if workers > 1 and not uses_ollama():
+        logger.warning(f"Each of the {workers} workers loads its own copy of the Transformers model")
+
+    logger.info(f"Starting API server on {server_host}:{server_port} with {workers} workers")
 
     # Run the server
     try:
@@ -54,19 +114,21 @@ def run_server(host: Optional[str] = None, port: Optional[int] = None) -> None:
 
         logger.info(f"Using module path: {module_path}")
 
-        # Import uvicorn again to avoid shadowing
-        import uvicorn as uvicorn_run
-
-        uvicorn_run.run(
+        uvicorn.run(
             module_path,
             host=server_host,
             port=server_port,
-            reload=str(get_config("debug", "False")).lower() == "true"
+            reload=reload,
+            workers=workers,
+            # "auto" picks uvloop and httptools when installed (uvicorn[standard])
+            loop="auto",
+            http="auto",
+            backlog=2048
         )
     except Exception as e:
         logger.error(f"Error starting server: {e}")
         # Fallback to running the app directly
-        import uvicorn.config
-        config = uvicorn.config.Config(app=app, host=server_host, port=server_port)
+        config = uvicorn.Config(app=app, host=server_host, port=server_port,
+                                loop="auto", http="auto", backlog=2048)
         server = uvicorn.Server(config)
         server.run()
@@ -77,6 +77,7 @@ def list_documents(args: argparse.Namespace) -> None:
         args: Command-line arguments
     """
     import lancedb
+    import pyarrow.compute as pc
 
     db_path = args.db_path or get_config("vector_db_path")
     table_name = args.table or get_config("vector_db_table")
@@ -90,15 +91,15 @@ def list_documents(args: argparse.Namespace) -> None:
             return
 
         table = db.open_table(table_name)
-        data = table.to_pandas()
 
-        # Group by source document
-        sources = data["doc_source"].unique()
+        # Read only the source column, so the embedding vectors are never
+        # loaded, and count chunks per source document in Arrow
+        sources = table.to_lance().to_table(columns=["doc_source"]).column("doc_source")
+        counts = pc.value_counts(sources).to_pylist()
 
-        logger.info(f"Found {len(sources)} documents:")
-        for source in sources:
-            count = len(data[data["doc_source"] == source])
-            logger.info(f"- {source}: {count} chunks")
+        logger.info(f"Found {len(counts)} documents:")
+        for entry in counts:
+            logger.info(f"- {entry['values']}: {entry['counts']} chunks")
     except Exception as e:
         logger.error(f"Error listing documents: {e}")
 
@@ -4,72 +4,111 @@ Main CLI entry point for Solar Sage.
 This module provides the main CLI entry point for the application.
 """
 import argparse
+import importlib
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from core.logging import setup_logging, get_logger
-from cli.commands import (
-    run_server,
-    ingest_document,
-    list_documents,
-    run_ui,
-    run_evaluation,
-)
+from core import __version__
 
-logger = get_logger(__name__)
+# Command handlers as (module, function), imported only once the command is
+# known so --help and argument errors skip loading them
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "server": ("cli.commands", "run_server"),
+    "ui": ("cli.commands", "run_ui"),
+    "ingest": ("cli.commands", "ingest_document"),
+    "list": ("cli.commands", "list_documents"),
+    "evaluate": ("cli.commands", "run_evaluation"),
+}
+
+
+def _add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", help="Server host")
+    parser.add_argument("--port", type=int, help="Server port")
+
+
+def _add_ui_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--port", type=int, help="UI port")
+    parser.add_argument("--mode", choices=["main", "evaluation"], default="main",
+                        help="UI mode to run (main or evaluation)")
+    parser.add_argument("--share", action="store_true",
+                        help="Create a public link for sharing")
+
+
+def _add_ingest_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("source", help="Document source (file path or URL)")
+    parser.add_argument("--db-path", help="Vector database path")
+    parser.add_argument("--table", help="Vector database table")
+    parser.add_argument("--model", help="Embedding model")
+    parser.add_argument("--strategy", help="Chunking strategy")
+
+
+def _add_list_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--db-path", help="Vector database path")
+    parser.add_argument("--table", help="Vector database table")
+
+
+def _add_evaluate_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--csv", default="evaluation/eval_questions.csv",
+                        help="CSV file with evaluation questions")
+    parser.add_argument("--references", default="evaluation/reference_answers.json",
+                        help="JSON file with reference answers")
+    parser.add_argument("--output-dir", default="evaluation/results",
+                        help="Directory to save evaluation results")
+    parser.add_argument("--no-dual-agent", action="store_true",
+                        help="Disable dual-agent architecture")
+    parser.add_argument("--weather", action="store_true",
+                        help="Include weather context")
+
+
+# Subcommands as name -> (help, function adding the subcommand's arguments)
+SUBCOMMANDS = {
+    "server": ("Run the API server", _add_server_arguments),
+    "ui": ("Run the UI", _add_ui_arguments),
+    "ingest": ("Ingest a document", _add_ingest_arguments),
+    "list": ("List ingested documents", _add_list_arguments),
+    "evaluate": ("Evaluate RAG system", _add_evaluate_arguments),
+}
+
+
+def _sniff_subcommand(args: List[str]) -> Optional[str]:
+    """
+    Find the subcommand in the arguments without parsing them.
+
+    Args:
+        args: Command-line arguments
+
+    Returns:
+        The first known subcommand, or None if there is none
+    """
+    return next((arg for arg in args if arg in SUBCOMMANDS), None)
 
 
 def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
     """
     Parse command-line arguments.
 
+    Only the subcommand being run gets its arguments; the others are
+    registered by name so they are still listed in the top-level help. With
+    no subcommand (e.g. --help or --version) no arguments are built at all.
+
     Args:
         args: Command-line arguments
 
     Returns:
         Parsed arguments
     """
+    if args is None:
+        args = sys.argv[1:]
+    command = _sniff_subcommand(args)
+
     parser = argparse.ArgumentParser(description="Solar Sage CLI")
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
-    # Server command
-    server_parser = subparsers.add_parser("server", help="Run the API server")
-    server_parser.add_argument("--host", help="Server host")
-    server_parser.add_argument("--port", type=int, help="Server port")
-
-    # UI command
-    ui_parser = subparsers.add_parser("ui", help="Run the UI")
-    ui_parser.add_argument("--port", type=int, help="UI port")
-    ui_parser.add_argument("--mode", choices=["main", "evaluation"], default="main",
-                         help="UI mode to run (main or evaluation)")
-    ui_parser.add_argument("--share", action="store_true",
-                         help="Create a public link for sharing")
-
-    # Ingest command
-    ingest_parser = subparsers.add_parser("ingest", help="Ingest a document")
-    ingest_parser.add_argument("source", help="Document source (file path or URL)")
-    ingest_parser.add_argument("--db-path", help="Vector database path")
-    ingest_parser.add_argument("--table", help="Vector database table")
-    ingest_parser.add_argument("--model", help="Embedding model")
-    ingest_parser.add_argument("--strategy", help="Chunking strategy")
-
-    # List command
-    list_parser = subparsers.add_parser("list", help="List ingested documents")
-    list_parser.add_argument("--db-path", help="Vector database path")
-    list_parser.add_argument("--table", help="Vector database table")
-
-    # Evaluate command
-    eval_parser = subparsers.add_parser("evaluate", help="Evaluate RAG system")
-    eval_parser.add_argument("--csv", default="evaluation/eval_questions.csv",
-                           help="CSV file with evaluation questions")
-    eval_parser.add_argument("--references", default="evaluation/reference_answers.json",
-                           help="JSON file with reference answers")
-    eval_parser.add_argument("--output-dir", default="evaluation/results",
-                           help="Directory to save evaluation results")
-    eval_parser.add_argument("--no-dual-agent", action="store_true",
-                           help="Disable dual-agent architecture")
-    eval_parser.add_argument("--weather", action="store_true",
-                           help="Include weather context")
+    for name, (help_text, add_arguments) in SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if name == command:
+            add_arguments(subparser)
 
     return parser.parse_args(args)
 
@@ -84,28 +123,24 @@ def main(args: Optional[List[str]] = None) -> int:
     Returns:
         Exit code
     """
-    # Parse arguments
+    # Parse arguments; --help and --version exit here, before any setup
     parsed_args = parse_args(args)
 
     # Set up logging
+    from core.logging import setup_logging, get_logger
     setup_logging()
+    logger = get_logger(__name__)
 
     # Run command
     try:
-        if parsed_args.command == "server":
-            run_server(parsed_args)
-        elif parsed_args.command == "ui":
-            run_ui(parsed_args)
-        elif parsed_args.command == "ingest":
-            ingest_document(parsed_args)
-        elif parsed_args.command == "list":
-            list_documents(parsed_args)
-        elif parsed_args.command == "evaluate":
-            run_evaluation(parsed_args)
-        else:
+        if parsed_args.command not in COMMANDS:
             logger.error("No command specified")
             return 1
 
+        module_name, handler_name = COMMANDS[parsed_args.command]
+        handler = getattr(importlib.import_module(module_name), handler_name)
+        handler(parsed_args)
+
         return 0
     except Exception as e:
         logger.exception(f"Error running command: {e}")
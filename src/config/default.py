@@ -13,17 +13,22 @@ DEFAULT_CONFIG = {
     # Server settings
     "api_host": "0.0.0.0",
     "api_port": 8000,
+    "api_workers": None,  # CPU count with Ollama, 1 with in-process Transformers
+    "api_threadpool_size": 40,  # Concurrent blocking RAG calls per worker
     "ui_port": 8502,
 
     # Data settings
     "data_dir": "./data",
     "vector_db_path": "./data/lancedb",
     "vector_db_table": "solar_knowledge",
+    "weather_cache_path": "./data/weather_cache.sqlite",
+    "memory_dir": "./data/memory",
 
     # Model settings
     "embedding_model": "all-MiniLM-L6-v2",
     "llm_provider": "ollama",
     "llm_model": "mistral",
+    "llm_warm_up": False,  # Prime the LLM prompt cache at server startup
 
     # External API settings
     "openweather_api_key": "",
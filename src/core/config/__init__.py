@@ -4,7 +4,9 @@ Configuration module for Solar Sage.
 This module provides access to configuration settings for different environments.
 """
 import os
-from typing import Dict, Any
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
 
 # Import environment-specific configurations
 from config.default import DEFAULT_CONFIG
@@ -20,19 +22,52 @@ elif ENV == "development":
 else:
     ENV_CONFIG = {}
 
-# Combine configurations
-CONFIG = {**DEFAULT_CONFIG, **ENV_CONFIG}
 
-# Override with environment variables
-for key in CONFIG:
-    env_key = f"SOLAR_SAGE_{key.upper()}"
-    if env_key in os.environ:
-        CONFIG[key] = os.environ[env_key]
+def _build_config() -> Dict[str, Any]:
+    """
+    Merge the default and environment configurations with environment variables.
+
+    Returns:
+        Dictionary of all configuration values
+    """
+    # Combine configurations
+    config = {**DEFAULT_CONFIG, **ENV_CONFIG}
+
+    # Override with environment variables
+    for key in config:
+        env_key = f"SOLAR_SAGE_{key.upper()}"
+        if env_key in os.environ:
+            config[key] = os.environ[env_key]
+
+    return config
+
+
+# Environment variables are read once here, not on every lookup
+CONFIG = _build_config()
+
+
+def invalidate_config_cache() -> None:
+    """
+    Re-read environment variable overrides into the configuration.
+
+    Call this after changing SOLAR_SAGE_* environment variables at runtime,
+    e.g. in tests.
+    """
+    config = _build_config()
+    CONFIG.clear()
+    CONFIG.update(config)
+
+
+# Read-only view of CONFIG; it tracks invalidate_config_cache() without copying
+CONFIG_VIEW: Mapping[str, Any] = MappingProxyType(CONFIG)
 
 
 def get_config(key: str, default: Any = None) -> Any:
     """
     Get a configuration value.
+
+    Values are resolved once at import, so this is a plain dictionary lookup
+    and callers do not need to cache the result.
     
     Args:
         key: Configuration key
@@ -52,3 +87,65 @@ def get_all_config() -> Dict[str, Any]:
         Dictionary of all configuration values
     """
     return CONFIG.copy()
+
+
+def get_config_view() -> Mapping[str, Any]:
+    """
+    Get a read-only view of all configuration values.
+
+    Unlike get_all_config(), this does not copy the configuration, so it
+    is the cheaper choice for callers that only read it.
+
+    Returns:
+        Read-only mapping of all configuration values
+    """
+    return CONFIG_VIEW
+
+
+def _find_env_file() -> Optional[Path]:
+    """
+    Find the nearest .env file in this package's directory or its parents.
+
+    Like python-dotenv's load_dotenv(), this does not depend on the working
+    directory, so the project's .env is found when running from src/.
+
+    Returns:
+        Path to the .env file, or None if there is none
+    """
+    for directory in Path(__file__).resolve().parents:
+        env_path = directory / ".env"
+        if env_path.is_file():
+            return env_path
+    return None
+
+
+def load_env_file(path: Optional[str] = None) -> None:
+    """
+    Load KEY=value lines from a .env file into the environment.
+
+    Variables that are already set take precedence. Blank lines, comments
+    and lines without '=' are skipped, and surrounding quotes are removed.
+
+    Args:
+        path: Path to the .env file; defaults to the nearest .env file in the
+            project directories above this package
+    """
+    env_path = Path(path) if path is not None else _find_env_file()
+    if env_path is None or not env_path.is_file():
+        return
+
+    for line in env_path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        value = value.strip()
+        if value[:1] in ("'", '"') and value[-1:] == value[:1] and len(value) > 1:
+            value = value[1:-1]
+        else:
+            # Drop trailing comments from unquoted values
+            value = value.split(" #", 1)[0].rstrip()
+        os.environ.setdefault(key, value)
@@ -12,21 +12,43 @@ import math
 import re
 import numpy as np
 import numexpr as ne
-from typing import Dict, Any, List, Union, Callable, Optional
+from numexpr.necompiler import getExprNames, getType
+from typing import Dict, Any, List, Union, Callable, Optional, Tuple
 from pathlib import Path
-from functools import lru_cache
+from types import CodeType, MappingProxyType
+from functools import reduce
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Try to import SymPy, but don't fail if it's not available
+# Use the libyaml-backed loader when PyYAML was built with it
 try:
-    import sympy
-    from sympy import symbols, sympify, lambdify
-    SYMPY_AVAILABLE = True
+    from yaml import CSafeLoader as _YamlLoader
 except ImportError:
-    SYMPY_AVAILABLE = False
-    logger.warning("SymPy not available. Advanced symbolic math features will be disabled.")
+    from yaml import SafeLoader as _YamlLoader
+
+# SymPy is slow to import and only needed for symbolic fallbacks, so it is
+# imported on first use by _load_sympy; None until then
+SYMPY_AVAILABLE: Optional[bool] = None
+sympy = symbols = sympify = lambdify = None
+
+def _load_sympy() -> bool:
+    """
+    Import SymPy on first use, but don't fail if it's not available.
+
+    Returns:
+        Whether SymPy is available
+    """
+    global SYMPY_AVAILABLE, sympy, symbols, sympify, lambdify
+    if SYMPY_AVAILABLE is None:
+        try:
+            import sympy
+            from sympy import symbols, sympify, lambdify
+            SYMPY_AVAILABLE = True
+        except ImportError:
+            SYMPY_AVAILABLE = False
+            logger.warning("SymPy not available. Advanced symbolic math features will be disabled.")
+    return SYMPY_AVAILABLE
 
 # Define standard math function replacements for numexpr
 MATH_REPLACEMENTS = {
@@ -83,6 +105,76 @@ try:
 except Exception as e:
     logger.warning(f"Failed to discover additional replacements: {e}")
 
+# Precompiled patterns for _process_formula_for_numexpr
+_UNSUPPORTED_FUNCTIONS_RE = re.compile(r'(?:max|min|atan2|radians|degrees)\(')
+_CALLABLE_PARAMS_RE = re.compile(r'\b(radians|sin|cos|tan|asin|acos|atan)\b')
+# All function names in one alternation, longest first so 'math.log10' is
+# preferred over 'math.log'; word boundaries keep 'sin' from matching in 'asin'
+_FUNCTION_RE = re.compile(r'\b(?:' + '|'.join(
+    re.escape(pattern) for pattern in sorted(MATH_REPLACEMENTS, key=len, reverse=True)
+) + r')\b')
+_LOGICAL_RE = re.compile(r' (and|or|not)(?= )')
+_LOGICAL_OPERATORS = {'and': '&', 'or': '|', 'not': '~'}
+
+# Marks entries missing from the path and processed formula caches
+_MISSING = object()
+
+# Element-wise functions for the eval fallback when evaluating over arrays
+_ARRAY_EVAL_FUNCTIONS = {
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'asin': np.arcsin,
+    'acos': np.arccos,
+    'atan': np.arctan,
+    'atan2': np.arctan2,
+    'exp': np.exp,
+    'log': np.log,
+    'log10': np.log10,
+    'sqrt': np.sqrt,
+    'pow': np.power,
+    'abs': np.abs,
+    'max': lambda *args: reduce(np.maximum, args),
+    'min': lambda *args: reduce(np.minimum, args),
+    'radians': np.radians,
+    'degrees': np.degrees,
+}
+
+# Safe environment for the eval fallback, and its element-wise variant
+_EVAL_BASE_ENV = MappingProxyType({
+    # Basic math functions
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'atan2': math.atan2,
+    'exp': math.exp,
+    'log': math.log,
+    'log10': math.log10,
+    'sqrt': math.sqrt,
+    'pow': math.pow,
+    'abs': abs,
+    'max': max,
+    'min': min,
+
+    # Constants
+    'pi': math.pi,
+    'e': math.e,
+
+    # Conversion functions
+    'radians': math.radians,
+    'degrees': math.degrees,
+})
+_ARRAY_EVAL_ENV = MappingProxyType({**_EVAL_BASE_ENV, **_ARRAY_EVAL_FUNCTIONS})
+
+# Constants available to numexpr formulas
+_NUMEXPR_CONSTANTS = MappingProxyType({'pi': math.pi, 'e': math.e})
+
+# Maximum number of compiled numexpr expressions kept per metric layer
+COMPILED_CACHE_MAXSIZE = 256
+
 # Type for formula parameters
 FormulaParams = Dict[str, Union[float, int, bool, str, Callable]]
 
@@ -102,10 +194,21 @@ class SemanticMetricLayer:
             metrics_path = os.path.join(root_dir, "src", "config", "formulas.yaml")
 
         self.metrics_path = metrics_path
+        # Parsed YAML, kept on the instance so reload_metrics can clear it
+        self._metrics_cache: Optional[Dict[str, Any]] = None
+        logger.debug(f"Using {_YamlLoader.__name__} for YAML")
         self.metrics = self._load_metrics()
+        # Dot-separated path -> metric value, for paths that were found
+        self._path_cache: Dict[str, Any] = {}
+        # Formula string -> numexpr formula (None if not numexpr-compatible)
+        self._processed_cache: Dict[str, Optional[str]] = {}
+        # numexpr formula -> variable names, and (formula, signature) -> compiled expression
+        self._expr_names: Dict[str, List[str]] = {}
+        self._compiled: Dict[Tuple[str, Tuple], Any] = {}
+        # Formula string -> code object for the eval fallback
+        self._code_cache: Dict[str, CodeType] = {}
         logger.info(f"Loaded semantic metric layer from {metrics_path}")
 
-    @lru_cache(maxsize=1)
     def _load_metrics(self) -> Dict[str, Any]:
         """
         Load metrics from YAML file.
@@ -113,9 +216,13 @@ class SemanticMetricLayer:
         Returns:
             Dictionary of metrics
         """
+        if self._metrics_cache is not None:
+            return self._metrics_cache
+
         try:
             with open(self.metrics_path, 'r') as f:
-                metrics = yaml.safe_load(f)
+                metrics = yaml.load(f, Loader=_YamlLoader)
+            self._metrics_cache = metrics
             return metrics
         except Exception as e:
             logger.error(f"Error loading metrics from {self.metrics_path}: {e}")
@@ -131,15 +238,21 @@ class SemanticMetricLayer:
         Returns:
             Metric value or None if not found
         """
+        value = self._path_cache.get(path, _MISSING)
+        if value is not _MISSING:
+            return value
+
         try:
             value = self.metrics
             for key in path.split('.'):
                 value = value[key]
-            return value
         except (KeyError, TypeError) as e:
             logger.warning(f"Metric not found at path {path}: {e}")
             return None
 
+        self._path_cache[path] = value
+        return value
+
     def get_formula(self, path: str) -> Dict[str, Any]:
         """
         Get a formula definition from the semantic metric layer.
@@ -176,10 +289,31 @@ class SemanticMetricLayer:
         Returns:
             Result of the formula evaluation
         """
+        return self._evaluate(path, params, as_array=False)
+
+    def evaluate_formula_array(self, path: str, params: FormulaParams) -> np.ndarray:
+        """
+        Evaluate a formula metric element-wise over array parameters.
+
+        Parameters may be NumPy arrays (e.g. np.linspace(...)) or scalars, which
+        are broadcast against them, so a formula is evaluated for many inputs
+        in one call instead of one evaluate_formula call per input.
+
+        Args:
+            path: Dot-separated path to the formula metric
+            params: Dictionary of parameter values or arrays
+
+        Returns:
+            Array of results with the broadcast shape of the parameters
+        """
+        return self._evaluate(path, params, as_array=True)
+
+    def _evaluate(self, path: str, params: FormulaParams, as_array: bool) -> Union[float, np.ndarray]:
+        """Evaluate a formula metric, as a float or as an array of results."""
         formula_def = self.get_formula(path)
         if not formula_def:
             logger.error(f"Formula metric not found at path {path}")
-            return 0.0
+            return self._failed_result(params, as_array)
 
         formula_str = formula_def['formula']
 
@@ -187,9 +321,9 @@ class SemanticMetricLayer:
         preferred_method = formula_def.get('evaluation_method', 'auto')
 
         # If the preferred method is 'sympy' and SymPy is available, use it directly
-        if preferred_method == 'sympy' and SYMPY_AVAILABLE:
+        if preferred_method == 'sympy' and _load_sympy():
             logger.debug(f"Using SymPy for formula {path} (preferred method)")
-            sympy_result = self._sympy_evaluate(formula_str, params)
+            sympy_result = self._sympy_evaluate(formula_str, params, as_array)
             if sympy_result is not None:
                 return sympy_result
             # Fall back to other methods if SymPy fails
@@ -197,39 +331,40 @@ class SemanticMetricLayer:
         # If the preferred method is 'eval', use the fallback directly
         if preferred_method == 'eval':
             logger.debug(f"Using eval for formula {path} (preferred method)")
-            return self._fallback_evaluate(formula_str, params)
+            return self._fallback_evaluate(formula_str, params, as_array)
 
         # For 'auto' or 'numexpr' or if the preferred method failed, try numexpr first
-        # Process the formula for numexpr compatibility
-        processed_formula = self._process_formula_for_numexpr(formula_str)
+        # Process the formula for numexpr compatibility (once per formula)
+        processed_formula = self._processed_cache.get(formula_str, _MISSING)
+        if processed_formula is _MISSING:
+            processed_formula = self._process_formula_for_numexpr(formula_str)
+            self._processed_cache[formula_str] = processed_formula
 
         # If the formula can't be processed for numexpr, try SymPy next
         if processed_formula is None:
-            if SYMPY_AVAILABLE:
+            if _load_sympy():
                 logger.debug(f"Formula {path} not compatible with numexpr, trying SymPy")
-                sympy_result = self._sympy_evaluate(formula_str, params)
+                sympy_result = self._sympy_evaluate(formula_str, params, as_array)
                 if sympy_result is not None:
                     return sympy_result
 
             # If numexpr and SymPy both fail, use the fallback
             logger.debug(f"Using fallback evaluation for formula {path}")
-            return self._fallback_evaluate(formula_str, params)
+            return self._fallback_evaluate(formula_str, params, as_array)
 
         # Create local variables for numexpr
-        local_dict = {
-            # Constants
-            'pi': math.pi,
-            'e': math.e,
-        }
+        local_dict = dict(_NUMEXPR_CONSTANTS)
 
         # Add the parameters to the local dict
         local_dict.update(params)
 
         try:
             # Evaluate the formula using numexpr
-            result = ne.evaluate(processed_formula, local_dict=local_dict)
+            result = self._numexpr_evaluate(processed_formula, local_dict)
 
             # Handle scalar vs array results
+            if as_array:
+                return np.asarray(result, dtype=float)
             if hasattr(result, 'item'):
                 return float(result.item())
             return float(result)
@@ -237,15 +372,44 @@ class SemanticMetricLayer:
             logger.debug(f"Error evaluating formula metric '{processed_formula}' with numexpr: {e}")
 
             # Try SymPy next if available
-            if SYMPY_AVAILABLE:
+            if _load_sympy():
                 logger.debug(f"Trying SymPy for formula {path} after numexpr failed")
-                sympy_result = self._sympy_evaluate(formula_str, params)
+                sympy_result = self._sympy_evaluate(formula_str, params, as_array)
                 if sympy_result is not None:
                     return sympy_result
 
             # If both numexpr and SymPy fail, use the fallback
             logger.debug(f"Using fallback evaluation for formula {path} after all other methods failed")
-            return self._fallback_evaluate(formula_str, params)
+            return self._fallback_evaluate(formula_str, params, as_array)
+
+    def _numexpr_evaluate(self, formula: str, local_dict: Dict[str, Any]) -> Any:
+        """
+        Evaluate a numexpr formula, compiling it once per argument signature.
+
+        Args:
+            formula: Formula processed for numexpr
+            local_dict: Variable values
+
+        Returns:
+            Result of the formula evaluation
+        """
+        names = self._expr_names.get(formula)
+        if names is None:
+            names = getExprNames(formula, {})[0]
+            self._expr_names[formula] = names
+
+        args = [np.asarray(local_dict[name]) for name in names]
+        signature = tuple((name, getType(arg)) for name, arg in zip(names, args))
+
+        key = (formula, signature)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            if len(self._compiled) >= COMPILED_CACHE_MAXSIZE:
+                del self._compiled[next(iter(self._compiled))]
+            compiled = ne.NumExpr(formula, list(signature))
+            self._compiled[key] = compiled
+
+        return compiled(*args)
 
     def _process_formula_for_numexpr(self, formula: str) -> Optional[str]:
         """
@@ -258,61 +422,42 @@ class SemanticMetricLayer:
             Processed formula string for numexpr or None if not compatible
         """
         # Check for functions that numexpr doesn't support well
-        unsupported_functions = ['max(', 'min(', 'atan2(', 'radians(', 'degrees(']
-        for func in unsupported_functions:
-            if func in formula:
-                logger.debug(f"Formula contains {func} which is not well supported by numexpr, using fallback: {formula}")
-                return None
+        match = _UNSUPPORTED_FUNCTIONS_RE.search(formula)
+        if match:
+            logger.debug(f"Formula contains {match.group()} which is not well supported by numexpr, using fallback: {formula}")
+            return None
 
         # Check for callable parameters (like math.sin passed as a parameter)
         # But don't reject formulas that just happen to contain these strings as part of variable names
         if 'radians' in formula or 'sin' in formula or 'cos' in formula:
-            for param in ['radians', 'sin', 'cos', 'tan', 'asin', 'acos', 'atan']:
-                # Only consider it a callable parameter if it's a standalone word
-                # This avoids rejecting formulas with variable names like 'sinx'
-                if re.search(rf'\b{param}\b', formula) and param + '(' not in formula:
+            # Only consider it a callable parameter if it's a standalone word
+            # This avoids rejecting formulas with variable names like 'sinx'
+            for match in _CALLABLE_PARAMS_RE.finditer(formula):
+                param = match.group(1)
+                if param + '(' not in formula:
                     logger.debug(f"Formula may contain callable parameter {param}, using fallback: {formula}")
                     return None
 
-        # Apply dynamic function replacements
-        processed = formula
-
-        # First, handle function calls with parentheses to avoid double replacements
-        for pattern, replacement in MATH_REPLACEMENTS.items():
-            if '(' not in pattern and pattern + '(' in processed:
-                # Replace function calls like 'sin(' with 'sin('
-                processed = re.sub(rf'\b{re.escape(pattern)}\(', f"{replacement}(", processed)
-
-        # Then handle function names without parentheses
-        for pattern, replacement in MATH_REPLACEMENTS.items():
-            if '(' not in pattern:
-                # Replace function names like 'math.sin' with 'sin'
-                processed = re.sub(rf'\b{re.escape(pattern)}\b', replacement, processed)
+        # Replace function names like 'math.sin' with their numexpr names in one pass
+        processed = _FUNCTION_RE.sub(lambda match: MATH_REPLACEMENTS[match.group()], formula)
 
         # Replace and/or/not with &/|/~
-        logical_replacements = {
-            ' and ': ' & ',
-            ' or ': ' | ',
-            ' not ': ' ~ ',
-        }
+        return _LOGICAL_RE.sub(lambda match: ' ' + _LOGICAL_OPERATORS[match.group(1)], processed)
 
-        for old, new in logical_replacements.items():
-            processed = processed.replace(old, new)
-
-        return processed
-
-    def _sympy_evaluate(self, formula_str: str, params: FormulaParams) -> Optional[float]:
+    def _sympy_evaluate(self, formula_str: str, params: FormulaParams,
+                        as_array: bool = False) -> Union[float, np.ndarray, None]:
         """
         Evaluate a formula using SymPy for symbolic mathematics.
 
         Args:
             formula_str: Original formula string
             params: Dictionary of parameter values
+            as_array: Whether to return an array of results instead of a float
 
         Returns:
             Result of the formula evaluation or None if evaluation fails
         """
-        if not SYMPY_AVAILABLE:
+        if not _load_sympy():
             logger.debug("SymPy not available, skipping symbolic evaluation")
             return None
 
@@ -363,68 +508,60 @@ class SemanticMetricLayer:
             param_values = [params[name] for name in param_symbols.keys()]
             result = func(*param_values)
 
-            return float(result)
+            return np.asarray(result, dtype=float) if as_array else float(result)
         except Exception as e:
             logger.debug(f"SymPy evaluation failed for formula {formula_str}: {e}")
             return None
 
-    def _fallback_evaluate(self, formula_str: str, params: FormulaParams) -> float:
+    def _fallback_evaluate(self, formula_str: str, params: FormulaParams,
+                           as_array: bool = False) -> Union[float, np.ndarray]:
         """
         Fallback evaluation method using Python's eval for functions not supported by numexpr.
 
         Args:
             formula_str: Original formula string
             params: Dictionary of parameter values
+            as_array: Whether to evaluate element-wise and return an array
 
         Returns:
             Result of the formula evaluation
         """
         logger.debug(f"Using fallback evaluation for formula: {formula_str}")
 
-        # Create a safe evaluation environment with math functions
-        eval_env = {
-            # Basic math functions
-            'sin': math.sin,
-            'cos': math.cos,
-            'tan': math.tan,
-            'asin': math.asin,
-            'acos': math.acos,
-            'atan': math.atan,
-            'atan2': math.atan2,
-            'exp': math.exp,
-            'log': math.log,
-            'log10': math.log10,
-            'sqrt': math.sqrt,
-            'pow': math.pow,
-            'abs': abs,
-            'max': max,
-            'min': min,
-
-            # Constants
-            'pi': math.pi,
-            'e': math.e,
-
-            # Conversion functions
-            'radians': math.radians,
-            'degrees': math.degrees,
-        }
+        # Start from the safe math environment, element-wise for arrays
+        eval_env = dict(_ARRAY_EVAL_ENV if as_array else _EVAL_BASE_ENV)
 
         # Add the parameters to the environment
         eval_env.update(params)
 
         try:
+            # Compile the formula once and reuse the code object
+            code = self._code_cache.get(formula_str)
+            if code is None:
+                code = compile(formula_str, '<formula>', 'eval')
+                self._code_cache[formula_str] = code
+
             # Evaluate the formula
-            result = eval(formula_str, {"__builtins__": {}}, eval_env)
-            return float(result)
+            result = eval(code, {"__builtins__": {}}, eval_env)
+            return np.asarray(result, dtype=float) if as_array else float(result)
         except Exception as e:
             logger.error(f"Fallback evaluation failed for formula {formula_str}: {e}")
+            return self._failed_result(params, as_array)
+
+    @staticmethod
+    def _failed_result(params: FormulaParams, as_array: bool) -> Union[float, np.ndarray]:
+        """Result for a formula that could not be evaluated: zero, or zeros shaped like the parameters."""
+        if not as_array:
             return 0.0
+        shapes = [np.shape(value) for value in params.values() if not callable(value)]
+        return np.zeros(np.broadcast_shapes(*shapes))
 
     def reload_metrics(self):
         """Reload metrics from the YAML file."""
         # Clear the cache to force reload
-        self._load_metrics.cache_clear()
+        self._metrics_cache = None
         self.metrics = self._load_metrics()
+        self._path_cache.clear()
         logger.info(f"Reloaded semantic metric layer from {self.metrics_path}")
 
 
@@ -468,6 +605,19 @@ def evaluate_formula(path: str, params: FormulaParams) -> float:
     """
     return get_metric_layer().evaluate_formula(path, params)
 
+def evaluate_formula_array(path: str, params: FormulaParams) -> np.ndarray:
+    """
+    Evaluate a formula metric element-wise over array parameters.
+
+    Args:
+        path: Dot-separated path to the formula metric
+        params: Dictionary of parameter values or arrays
+
+    Returns:
+        Array of results with the broadcast shape of the parameters
+    """
+    return get_metric_layer().evaluate_formula_array(path, params)
+
 def reload_metrics():
     """Reload metrics from the YAML file."""
     get_metric_layer().reload_metrics()
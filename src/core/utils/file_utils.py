@@ -4,9 +4,12 @@ File utility functions for Solar Sage.
 This module contains utility functions for working with files.
 """
 import os
-import json
+import orjson
 from typing import Any, Dict, List, Optional, Union
 
+# Indented like json.dump(indent=2); also accept non-string keys and NumPy values
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
 
 def ensure_dir(directory: str) -> None:
     """
@@ -15,8 +18,7 @@ def ensure_dir(directory: str) -> None:
     Args:
         directory: Directory path
     """
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    os.makedirs(directory, exist_ok=True)
 
 
 def read_json(file_path: str) -> Dict[str, Any]:
@@ -33,8 +35,8 @@ def read_json(file_path: str) -> Dict[str, Any]:
         FileNotFoundError: If file not found
         json.JSONDecodeError: If file is not valid JSON
     """
-    with open(file_path, "r") as f:
-        return json.load(f)
+    with open(file_path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def write_json(file_path: str, data: Union[Dict[str, Any], List[Any]]) -> None:
@@ -46,13 +48,11 @@ def write_json(file_path: str, data: Union[Dict[str, Any], List[Any]]) -> None:
         data: Data to write
     """
     # Ensure directory exists
-    directory = os.path.dirname(file_path)
-    if directory:
-        ensure_dir(directory)
+    ensure_dir(os.path.dirname(file_path) or ".")
     
-    # Write data
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
+    # Write data; orjson encodes straight to bytes
+    with open(file_path, "wb") as f:
+        f.write(orjson.dumps(data, option=_JSON_OPTIONS))
 
 
 def read_text(file_path: str) -> str:
@@ -81,9 +81,7 @@ def write_text(file_path: str, text: str) -> None:
         text: Text to write
     """
     # Ensure directory exists
-    directory = os.path.dirname(file_path)
-    if directory:
-        ensure_dir(directory)
+    ensure_dir(os.path.dirname(file_path) or ".")
     
     # Write text
     with open(file_path, "w") as f:
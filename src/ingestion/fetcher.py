@@ -1,7 +1,44 @@
 import os
+import shutil
 import requests
 import tempfile
 from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Downloads are copied to disk in chunks of this many bytes
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Shared session keeps connections alive across downloads in a batch and
+# retries transient failures
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+def close_session() -> None:
+    """
+    Closes the shared download session.
+    """
+    _SESSION.close()
+
+
+def download_file(url: str, path: str) -> None:
+    """
+    Streams the response body for a URL to a file without buffering it in memory.
+    """
+    with _SESSION.get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        # Let urllib3 undo any gzip/deflate Content-Encoding while copying
+        response.raw.decode_content = True
+        with open(path, "wb") as f:
+            shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+
 
 def fetch_pdf(url: str) -> Optional[str]:
     """
@@ -15,11 +52,7 @@ def fetch_pdf(url: str) -> Optional[str]:
 
         local_path = os.path.join(temp_dir, filename)
 
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-
-        with open(local_path, "wb") as f:
-            f.write(response.content)
+        download_file(url, local_path)
 
         return local_path
     except Exception as e:
@@ -35,10 +68,6 @@ def fetch_pdf_from_url(url: str, save_dir: str, filename: str) -> str:
     os.makedirs(save_dir, exist_ok=True)
     save_path = os.path.join(save_dir, f"{filename}.pdf")
 
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-
-    with open(save_path, "wb") as f:
-        f.write(response.content)
+    download_file(url, save_path)
 
     return save_path
@@ -1,17 +1,22 @@
 import os
-import requests
 import tempfile
+import threading
 import pandas as pd
 from sentence_transformers import SentenceTransformer
 import lancedb
 from typing import Optional
 
+from ingestion.fetcher import download_file
 from ingestion.parser import extract_text_from_pdf
 from ingestion.cleaner import clean_and_split
 
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
+# Pipelines may run in parallel threads; embedding and storing is serialized
+# so only one model is loaded at a time and table creation cannot race
+_STORE_LOCK = threading.Lock()
+
 
 def fetch_pdf(url: str) -> Optional[str]:
     """
@@ -24,10 +29,7 @@ def fetch_pdf(url: str) -> Optional[str]:
     local_path = os.path.join(temp_dir, filename)
 
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        with open(local_path, "wb") as f:
-            f.write(response.content)
+        download_file(url, local_path)
         print(f"Downloaded PDF from {url}")
         return local_path
     except Exception as e:
@@ -87,5 +89,6 @@ def run_pipeline(source: str, db_path: str, table_name: str, model_name: str) ->
         print("[WARNING] No valid text chunks extracted.")
         return False
 
-    embed_and_store(chunks, db_path, table_name, model_name)
+    with _STORE_LOCK:
+        embed_and_store(chunks, db_path, table_name, model_name)
     return True
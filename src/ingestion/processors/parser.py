@@ -1,8 +1,26 @@
+import io
+from typing import Iterator
+
 import fitz  # PyMuPDF
 
+def extract_text_pages(pdf_path: str) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF using PyMuPDF, one page at a time.
+    """
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            yield page.get_text()
+
 def extract_text_from_pdf(pdf_path: str) -> str:
     """
     Extract full text from a PDF using PyMuPDF.
+
+    Pages are appended to a single buffer as they are read, so page texts
+    are not all held alongside the joined result.
     """
-    with fitz.open(pdf_path) as doc:
-        return "\n".join(page.get_text() for page in doc)
+    buf = io.StringIO()
+    for i, text in enumerate(extract_text_pages(pdf_path)):
+        if i:
+            buf.write("\n")
+        buf.write(text)
+    return buf.getvalue()
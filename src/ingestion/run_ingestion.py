@@ -1,4 +1,5 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from ingestion.pipeline import run_pipeline
 
 def main():
@@ -8,13 +9,20 @@ def main():
     parser.add_argument("--db_path", default="./data/lancedb", help="LanceDB storage path")
     parser.add_argument("--table_name", default="solar_knowledge", help="LanceDB table name")
     parser.add_argument("--model_name", default="all-MiniLM-L6-v2", help="Embedding model")
+    parser.add_argument("--workers", type=int, default=8, help="URLs to fetch and parse in parallel")
 
     args = parser.parse_args()
 
     if args.input_file:
         with open(args.input_file, "r") as f:
             links = [line.strip() for line in f if line.strip()]
-        success = sum(run_pipeline(url, args.db_path, args.table_name, args.model_name) for url in links)
+        # Downloads and PDF parsing overlap across threads; storing is serialized
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(
+                lambda url: run_pipeline(url, args.db_path, args.table_name, args.model_name),
+                links
+            ))
+        success = sum(results)
         print(f"{success} succeeded / {len(links)} total")
     elif args.pdf_path:
         success = run_pipeline(args.pdf_path, args.db_path, args.table_name, args.model_name)
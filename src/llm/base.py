@@ -1,6 +1,26 @@
+import os
 from abc import ABC, abstractmethod
+from typing import Iterator, List
+
+# Backends return error text with one of these prefixes instead of raising
+LLM_ERROR_PREFIXES = ("[Ollama Error]", "[Transformers Error]")
+
+def is_llm_error(text: str) -> bool:
+    return text.startswith(LLM_ERROR_PREFIXES)
+
+def uses_ollama() -> bool:
+    # Ollama serves the model from its own process; otherwise it is loaded in-process
+    return os.getenv("USE_OLLAMA", "true").lower() == "true"
 
 class LLMInterface(ABC):
     @abstractmethod
     def generate(self, prompt: str, max_new_tokens: int = 200) -> str:
         pass
+
+    def stream(self, prompt: str, max_new_tokens: int = 200) -> Iterator[str]:
+        # Backends without native streaming yield the full response at once
+        yield self.generate(prompt, max_new_tokens)
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 200) -> List[str]:
+        # Backends without batched inference generate the prompts one by one
+        return [self.generate(prompt, max_new_tokens) for prompt in prompts]
@@ -1,8 +1,9 @@
-import os
+from llm.base import uses_ollama
 from llm.ollama_llm import OllamaLLM
 from llm.transformer_llm import TransformersLLM
 
 def get_llm():
-    if os.getenv("USE_OLLAMA", "true").lower() == "true":
+    if uses_ollama():
         return OllamaLLM()
-    return TransformersLLM()
+    # Share the loaded model between all agents
+    return TransformersLLM.get()
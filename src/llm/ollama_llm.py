@@ -1,28 +1,90 @@
 import os
-import requests
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List
+import httpx
 from llm.base import LLMInterface
 
+# Shared client keeps connections to the Ollama server alive between calls.
+# It is created on first use and again after close_client(), so the app can
+# be started and shut down more than once in a process.
+_client = None
+_client_lock = threading.Lock()
+
+def _get_client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            # Generation can take minutes, so only connecting is time-limited
+            _client = httpx.Client(
+                timeout=httpx.Timeout(None, connect=10.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return _client
+
+def close_client() -> None:
+    """Close the shared Ollama client; the next request opens a new one."""
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+
 class OllamaLLM(LLMInterface):
     def __init__(self):
         self.url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         self.model = os.getenv("OLLAMA_MODEL", "mistral")
+        # Match the number of requests the Ollama server handles in parallel
+        self.max_parallel = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+    def _payload(self, prompt: str, max_new_tokens: int, stream: bool) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "num_predict": max_new_tokens
+            }
+        }
 
     def generate(self, prompt: str, max_new_tokens: int = 200) -> str:
         try:
-            res = requests.post(
+            res = _get_client().post(
                 f"{self.url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "num_predict": max_new_tokens
-                    }
-                }
+                json=self._payload(prompt, max_new_tokens, stream=False)
             )
             res.raise_for_status()
             return res.json()["response"].strip()
         except Exception as e:
             return f"[Ollama Error] {str(e)}"
+
+    def stream(self, prompt: str, max_new_tokens: int = 200) -> Iterator[str]:
+        try:
+            with _get_client().stream(
+                "POST",
+                f"{self.url}/api/generate",
+                json=self._payload(prompt, max_new_tokens, stream=True)
+            ) as res:
+                res.raise_for_status()
+                # Ollama streams one JSON object per line
+                for line in res.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+        except Exception as e:
+            yield f"[Ollama Error] {str(e)}"
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 200) -> List[str]:
+        if len(prompts) <= 1:
+            return [self.generate(prompt, max_new_tokens) for prompt in prompts]
+
+        # Ollama batches concurrent requests server-side, so send them together
+        generate = partial(self.generate, max_new_tokens=max_new_tokens)
+        with ThreadPoolExecutor(max_workers=min(len(prompts), self.max_parallel)) as executor:
+            return list(executor.map(generate, prompts))
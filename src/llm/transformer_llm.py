@@ -1,39 +1,131 @@
 import os
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Let the CUDA allocator grow segments instead of fragmenting memory;
+# this must be set before torch initializes CUDA
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
 import torch
 from llm.base import LLMInterface
 
-class TransformersLLM(LLMInterface):
-    def __init__(self):
-        # Get models directory from environment variable with fallback to default
-        models_dir = os.getenv("SOLAR_SAGE_MODELS_DIR", "./models")
-        model_name = os.getenv("SOLAR_SAGE_LLM_MODEL", "mistral-7b-instruct")
+# Let remaining float32 matmuls use TF32 tensor cores
+torch.set_float32_matmul_precision("high")
+torch.backends.cuda.matmul.allow_tf32 = True
+
+# Loaded models keyed on (model path, quantization), shared by all callers
+_MODEL_CACHE: Dict[Tuple[str, str], "TransformersLLM"] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
 
-        # Construct the full model path
-        model_path = os.path.join(models_dir, model_name)
+def _default_model_path() -> str:
+    # Get models directory from environment variable with fallback to default
+    models_dir = os.getenv("SOLAR_SAGE_MODELS_DIR", "./models")
+    model_name = os.getenv("SOLAR_SAGE_LLM_MODEL", "mistral-7b-instruct")
+
+    # Construct the full model path
+    return os.path.join(models_dir, model_name)
+
+def _quantization() -> str:
+    return os.getenv("SOLAR_SAGE_QUANT", "").lower()
+
+def _compute_dtype() -> torch.dtype:
+    # bfloat16 has float32's range and runs as fast as float16 on Ampere and newer
+    if not torch.cuda.is_available():
+        return torch.float32
+    if torch.cuda.get_device_capability()[0] >= 8:
+        return torch.bfloat16
+    return torch.float16
+
+class TransformersLLM(LLMInterface):
+    def __init__(self, model_path: Optional[str] = None):
+        if model_path is None:
+            model_path = _default_model_path()
 
         print(f"Loading model from: {model_path}")
 
+        # Optionally quantize the weights with bitsandbytes ("int8" or "nf4");
+        # this needs a GPU and mostly pays off for larger models
+        quant = _quantization()
+        if quant == "int8":
+            model_kwargs = {"quantization_config": BitsAndBytesConfig(
+                load_in_8bit=True,
+                llm_int8_threshold=6.0,
+                llm_int8_has_fp16_weight=False
+            )}
+        elif quant == "nf4":
+            model_kwargs = {"quantization_config": BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=_compute_dtype()
+            )}
+        else:
+            model_kwargs = {"torch_dtype": _compute_dtype()}
+
         self.tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+        # Batched prompts are padded to the same length on the left, so every
+        # row ends at its last prompt token and generation continues from there;
+        # over-long prompts keep their end, where the question is
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+        self.tokenizer.truncation_side = "left"
         self.model = AutoModelForCausalLM.from_pretrained(
             model_path,
-            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
             device_map="auto",
-            local_files_only=True
+            local_files_only=True,
+            **model_kwargs
         )
+        self.model.eval()
+
+        # The instance is shared, and a static cache / CUDA graph cannot serve two calls at once
+        self.lock = threading.Lock()
+
+        # Pre-allocate the KV cache where the architecture supports it, so the
+        # compiled decode step sees fixed shapes and can be replayed as a CUDA graph
+        self.static_cache = getattr(self.model, "_supports_static_cache", False)
+
+        # Optionally compile the forward pass so decode steps run as fused kernels.
+        # Compiling takes minutes, so it is opt-in; compiled kernels are cached on disk.
+        if os.getenv("SOLAR_SAGE_TORCH_COMPILE", "false").lower() == "true":
+            os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.join(os.path.dirname(model_path), ".inductor_cache"))
+            # CUDA graphs need fixed shapes; without a static cache they would be
+            # recaptured for every new prompt length
+            mode = "reduce-overhead" if self.static_cache else "default"
+            self.model.forward = torch.compile(self.model.forward, mode=mode, fullgraph=False)
+            # Compile now rather than on the first request
+            self.generate("Hello", max_new_tokens=4)
+
+    @classmethod
+    def get(cls, model_path: Optional[str] = None) -> "TransformersLLM":
+        # Loading weights dominates everything else, so load each model once per process
+        key = (model_path or _default_model_path(), _quantization())
+        with _MODEL_CACHE_LOCK:
+            if key not in _MODEL_CACHE:
+                _MODEL_CACHE[key] = cls(key[0])
+            return _MODEL_CACHE[key]
 
     def generate(self, prompt: str, max_new_tokens: int = 200) -> str:
+        return self.generate_batch([prompt], max_new_tokens)[0]
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 200) -> List[str]:
         try:
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
-            with torch.no_grad():
+            inputs = self.tokenizer(
+                prompts, padding=True, truncation=True, return_tensors="pt"
+            ).to(self.model.device)
+            with self.lock, torch.inference_mode():
                 outputs = self.model.generate(
                     **inputs,
                     max_new_tokens=max_new_tokens,
                     do_sample=True,
                     temperature=0.7,
                     top_p=0.9,
-                    eos_token_id=self.tokenizer.eos_token_id
+                    eos_token_id=self.tokenizer.eos_token_id,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    cache_implementation="static" if self.static_cache else None
                 )
-            return self.tokenizer.decode(outputs[0], skip_special_tokens=True)[len(prompt):].strip()
+            # Decode only the tokens generated after the (padded) prompts
+            generated = outputs[:, inputs.input_ids.shape[1]:]
+            return [text.strip() for text in self.tokenizer.batch_decode(generated, skip_special_tokens=True)]
         except Exception as e:
-            return f"[Transformers Error] {str(e)}"
+            return [f"[Transformers Error] {str(e)}"] * len(prompts)
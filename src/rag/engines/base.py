@@ -4,11 +4,14 @@ RAG Engine for Solar Sage.
 This module provides the core RAG functionality using the dual-agent architecture.
 """
 from typing import Dict, Any, Optional
+from agents.memory_system import MemorySystem
 from agents.orchestrator import AgentOrchestrator
 from core.config import get_config
 
-# Initialize the orchestrator
-orchestrator = AgentOrchestrator()
+# Initialize the orchestrator; streamed responses are recorded in the
+# user's transcript as they are generated
+memory_system = MemorySystem(storage_dir=get_config("memory_dir", "./data/memory"))
+orchestrator = AgentOrchestrator(memory_system=memory_system)
 
 def rag_answer(user_query: str) -> str:
     """
@@ -23,6 +26,10 @@ def rag_answer(user_query: str) -> str:
     result = orchestrator.process_query(user_query)
     return result["response"]
 
+def warm_up_prompt_cache() -> None:
+    """Prime the LLM prefix cache with the shared RAG prompt instructions."""
+    orchestrator.response_generator_agent.warm_up()
+
 def enhanced_rag_answer(
     user_query: str,
     lat: Optional[float] = None,
@@ -47,3 +54,31 @@ def enhanced_rag_answer(
         lon=lon,
         include_weather=include_weather
     )
+
+def enhanced_rag_answer_stream(
+    user_query: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    include_weather: bool = False,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate a streamed answer with metadata using the dual-agent RAG workflow.
+
+    Args:
+        user_query: User query
+        lat: Latitude (optional)
+        lon: Longitude (optional)
+        include_weather: Whether to include weather context
+        user_id: User whose transcript receives the partial response (optional)
+
+    Returns:
+        Dictionary with the response chunk iterator ("response_stream") and metadata
+    """
+    return orchestrator.process_query_stream(
+        query=user_query,
+        lat=lat,
+        lon=lon,
+        include_weather=include_weather,
+        user_id=user_id
+    )
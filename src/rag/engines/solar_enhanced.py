@@ -4,20 +4,63 @@ Solar-Enhanced RAG Engine for Solar Sage.
 This module provides RAG functionality enhanced with solar energy forecasting
 and cost savings analysis.
 """
-from typing import Dict, Any, Optional
+import asyncio
+from functools import partial
+from typing import Dict, Any, Optional, Tuple
 from agents.orchestrator import AgentOrchestrator
 from agents.integrations.solar_forecasting import (
     get_solar_demand_forecast,
     get_cost_savings_analysis
 )
-from agents.integrations.weather import get_weather_context_for_rag
+from agents.integrations.weather import (
+    get_weather_context_for_rag,
+    prefetch_weather_for_location
+)
 from core.config import get_config
 from core.logging import get_logger
+from rag.engines.base import memory_system
 
 logger = get_logger(__name__)
 
 # Initialize the orchestrator
-orchestrator = AgentOrchestrator()
+orchestrator = AgentOrchestrator(memory_system=memory_system)
+
+def _get_solar_forecast_data(
+    lat: float,
+    lon: float,
+    location_id: str,
+    system_capacity_kw: float,
+    electricity_rate: Optional[float] = None,
+    feed_in_tariff: Optional[float] = None
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Get the solar demand forecast and, if a rate is given, the cost savings analysis.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        location_id: Location identifier
+        system_capacity_kw: Solar system capacity in kW
+        electricity_rate: Electricity rate in currency per kWh (optional)
+        feed_in_tariff: Feed-in tariff for excess energy in currency per kWh (optional)
+
+    Returns:
+        Tuple of (forecast, cost_savings)
+    """
+    # Get solar demand forecast
+    forecast = get_solar_demand_forecast(
+        lat, lon, location_id, system_capacity_kw
+    )
+
+    # Get cost savings analysis if electricity rate is provided
+    cost_savings = None
+    if electricity_rate is not None:
+        cost_savings = get_cost_savings_analysis(
+            lat, lon, location_id, system_capacity_kw,
+            electricity_rate, feed_in_tariff
+        )
+
+    return forecast, cost_savings
 
 def solar_enhanced_rag_answer(
     user_query: str,
@@ -47,71 +90,213 @@ def solar_enhanced_rag_answer(
     Returns:
         Dictionary with response and metadata
     """
-    # Prepare additional context
-    additional_context = ""
-    
+    weather_context, solar_data = _gather_context(
+        lat, lon, location_id, system_capacity_kw, electricity_rate,
+        feed_in_tariff, include_weather, include_solar_forecast
+    )
+
+    # Process the query with additional context
+    result = orchestrator.process_query(
+        query=user_query,
+        additional_context=_build_additional_context(weather_context, solar_data)
+    )
+
+    return _attach_solar_forecast(result, solar_data)
+
+def solar_enhanced_rag_answer_stream(
+    user_query: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    location_id: Optional[str] = None,
+    system_capacity_kw: Optional[float] = None,
+    electricity_rate: Optional[float] = None,
+    feed_in_tariff: Optional[float] = None,
+    include_weather: bool = True,
+    include_solar_forecast: bool = True,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Streaming version of solar_enhanced_rag_answer.
+
+    Args:
+        user_query: User query
+        lat: Latitude (optional)
+        lon: Longitude (optional)
+        location_id: Location identifier (optional)
+        system_capacity_kw: Solar system capacity in kW (optional)
+        electricity_rate: Electricity rate in currency per kWh (optional)
+        feed_in_tariff: Feed-in tariff for excess energy in currency per kWh (optional)
+        include_weather: Whether to include weather context
+        include_solar_forecast: Whether to include solar forecast
+        user_id: User whose transcript receives the partial response (optional)
+
+    Returns:
+        Dictionary with the response chunk iterator ("response_stream") and metadata
+    """
+    weather_context, solar_data = _gather_context(
+        lat, lon, location_id, system_capacity_kw, electricity_rate,
+        feed_in_tariff, include_weather, include_solar_forecast
+    )
+
+    result = orchestrator.process_query_stream(
+        query=user_query,
+        additional_context=_build_additional_context(weather_context, solar_data),
+        user_id=user_id
+    )
+
+    return _attach_solar_forecast(result, solar_data)
+
+async def asolar_enhanced_rag_answer(
+    user_query: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    location_id: Optional[str] = None,
+    system_capacity_kw: Optional[float] = None,
+    electricity_rate: Optional[float] = None,
+    feed_in_tariff: Optional[float] = None,
+    include_weather: bool = True,
+    include_solar_forecast: bool = True
+) -> Dict[str, Any]:
+    """
+    Async version of solar_enhanced_rag_answer that gathers context concurrently.
+
+    Document retrieval, the weather context and the solar forecast are
+    independent, so they run at the same time in worker threads. The
+    end-to-end latency is then the slowest of the three instead of their sum.
+
+    Args:
+        user_query: User query
+        lat: Latitude (optional)
+        lon: Longitude (optional)
+        location_id: Location identifier (optional)
+        system_capacity_kw: Solar system capacity in kW (optional)
+        electricity_rate: Electricity rate in currency per kWh (optional)
+        feed_in_tariff: Feed-in tariff for excess energy in currency per kWh (optional)
+        include_weather: Whether to include weather context
+        include_solar_forecast: Whether to include solar forecast
+
+    Returns:
+        Dictionary with response and metadata
+    """
+    loop = asyncio.get_running_loop()
+    want_weather = include_weather and lat is not None and lon is not None
+    want_forecast = (include_solar_forecast and lat is not None and lon is not None and
+                     location_id is not None and system_capacity_kw is not None)
+
+    # Start retrieval right away; it does not depend on the location
+    max_documents = int(get_config("max_context_documents", 5))
+    retrieval = asyncio.ensure_future(
+        orchestrator.retriever_agent.afetch_context(user_query, max_documents)
+    )
+
+    # Fetch the weather once so both context builders read it from the cache
+    if want_weather or want_forecast:
+        await prefetch_weather_for_location(lat, lon)
+
+    tasks = [retrieval]
+    if want_weather:
+        tasks.append(loop.run_in_executor(None, get_weather_context_for_rag, lat, lon))
+    if want_forecast:
+        tasks.append(loop.run_in_executor(None, partial(
+            _get_solar_forecast_data, lat, lon, location_id, system_capacity_kw,
+            electricity_rate, feed_in_tariff
+        )))
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    context = results[0]
+    if isinstance(context, BaseException):
+        raise context
+
+    weather_context = None
+    solar_data = None
+    pending = iter(results[1:])
+
+    if want_weather:
+        weather_context = next(pending)
+        if isinstance(weather_context, BaseException):
+            logger.error(f"Error getting weather context: {weather_context}")
+            weather_context = None
+
+    if want_forecast:
+        solar_data = next(pending)
+        if isinstance(solar_data, BaseException):
+            logger.error(f"Error getting solar forecast: {solar_data}")
+            solar_data = None
+
+    # Generate the response with the pre-fetched documents
+    result = await loop.run_in_executor(None, partial(
+        orchestrator.process_query,
+        query=user_query,
+        additional_context=_build_additional_context(weather_context, solar_data),
+        context=context
+    ))
+
+    return _attach_solar_forecast(result, solar_data)
+
+def _gather_context(
+    lat: Optional[float],
+    lon: Optional[float],
+    location_id: Optional[str],
+    system_capacity_kw: Optional[float],
+    electricity_rate: Optional[float],
+    feed_in_tariff: Optional[float],
+    include_weather: bool,
+    include_solar_forecast: bool
+) -> Tuple[Optional[str], Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]:
+    """Get the weather context and solar forecast data that apply to a request."""
+    weather_context = None
+    solar_data = None
+
     # Add weather context if requested and location is provided
     if include_weather and lat is not None and lon is not None:
         try:
             weather_context = get_weather_context_for_rag(lat, lon)
-            additional_context += weather_context + "\n\n"
         except Exception as e:
             logger.error(f"Error getting weather context: {e}")
-    
+
     # Add solar forecast if requested and required parameters are provided
-    if (include_solar_forecast and lat is not None and lon is not None and 
+    if (include_solar_forecast and lat is not None and lon is not None and
             location_id is not None and system_capacity_kw is not None):
         try:
-            # Get solar demand forecast
-            forecast = get_solar_demand_forecast(
-                lat, lon, location_id, system_capacity_kw
+            solar_data = _get_solar_forecast_data(
+                lat, lon, location_id, system_capacity_kw,
+                electricity_rate, feed_in_tariff
             )
-            
-            # Get cost savings analysis if electricity rate is provided
-            cost_savings = None
-            if electricity_rate is not None:
-                cost_savings = get_cost_savings_analysis(
-                    lat, lon, location_id, system_capacity_kw,
-                    electricity_rate, feed_in_tariff
-                )
-            
-            # Format solar forecast context
-            solar_context = format_solar_forecast_context(forecast, cost_savings)
-            additional_context += solar_context
         except Exception as e:
             logger.error(f"Error getting solar forecast: {e}")
-    
-    # Process the query with additional context
-    result = orchestrator.process_query(
-        query=user_query,
-        additional_context=additional_context if additional_context else None
-    )
-    
-    # Add solar forecast data to the result if available
-    if (include_solar_forecast and lat is not None and lon is not None and 
-            location_id is not None and system_capacity_kw is not None):
+
+    return weather_context, solar_data
+
+def _build_additional_context(
+    weather_context: Optional[str],
+    solar_data: Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]
+) -> Optional[str]:
+    """Combine weather and solar forecast context for the orchestrator."""
+    additional_context = ""
+
+    if weather_context:
+        additional_context += weather_context + "\n\n"
+
+    if solar_data is not None:
         try:
-            # Get solar demand forecast
-            forecast = get_solar_demand_forecast(
-                lat, lon, location_id, system_capacity_kw
-            )
-            
-            # Get cost savings analysis if electricity rate is provided
-            cost_savings = None
-            if electricity_rate is not None:
-                cost_savings = get_cost_savings_analysis(
-                    lat, lon, location_id, system_capacity_kw,
-                    electricity_rate, feed_in_tariff
-                )
-            
-            # Add forecast data to result
-            result["solar_forecast"] = {
-                "forecast": forecast,
-                "cost_savings": cost_savings
-            }
+            additional_context += format_solar_forecast_context(*solar_data)
         except Exception as e:
-            logger.error(f"Error getting solar forecast data: {e}")
-    
+            logger.error(f"Error getting solar forecast: {e}")
+
+    return additional_context if additional_context else None
+
+def _attach_solar_forecast(
+    result: Dict[str, Any],
+    solar_data: Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]
+) -> Dict[str, Any]:
+    """Add solar forecast data to the result if available."""
+    if solar_data is not None:
+        forecast, cost_savings = solar_data
+        result["solar_forecast"] = {
+            "forecast": forecast,
+            "cost_savings": cost_savings
+        }
+
     return result
 
 
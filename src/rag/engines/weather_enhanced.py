@@ -7,7 +7,7 @@ It uses the dual-agent architecture for improved separation of concerns.
 """
 
 from typing import Dict, Any, Optional
-from rag.engines.base import rag_answer as enhanced_rag_answer
+from rag.engines.base import enhanced_rag_answer, enhanced_rag_answer_stream
 
 def is_weather_related_query(query: str) -> bool:
     """
@@ -104,3 +104,31 @@ def weather_enhanced_rag_answer(
         lon=lon,
         include_weather=include_weather
     )
+
+def weather_enhanced_rag_answer_stream(
+    user_query: str,
+    lat: float = None,
+    lon: float = None,
+    include_weather: bool = True,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate a streamed answer using RAG with weather context enhancement.
+
+    Args:
+        user_query: User's question
+        lat: Latitude (optional)
+        lon: Longitude (optional)
+        include_weather: Whether to include weather context
+        user_id: User whose transcript receives the partial response (optional)
+
+    Returns:
+        Dictionary with the response chunk iterator ("response_stream") and metadata
+    """
+    return enhanced_rag_answer_stream(
+        user_query=user_query,
+        lat=lat,
+        lon=lon,
+        include_weather=include_weather,
+        user_id=user_id
+    )
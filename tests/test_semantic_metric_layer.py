@@ -11,7 +11,9 @@ from pathlib import Path
 src_dir = Path(__file__).parent.parent / "src"
 sys.path.append(str(src_dir))
 
-from core.semantic_metric_layer import get_constant, evaluate_formula
+import numpy as np
+
+from core.semantic_metric_layer import get_constant, evaluate_formula, evaluate_formula_array
 
 def test_get_constant():
     """Test getting constants from the semantic metric layer."""
@@ -62,6 +64,25 @@ def test_evaluate_formula():
     
     print("evaluate_formula tests passed!\n")
 
+def test_evaluate_formula_array():
+    """Test evaluating formulas over arrays of parameters."""
+    print("Testing evaluate_formula_array...")
+    
+    # numexpr formula
+    cloud_cover = np.array([0, 50, 100])
+    cloud_impact = evaluate_formula_array('solar_irradiance.cloud_impact', {'cloud_cover': cloud_cover})
+    print(f"solar_irradiance.cloud_impact with cloud_cover={cloud_cover} = {cloud_impact}")
+    expected = [evaluate_formula('solar_irradiance.cloud_impact', {'cloud_cover': c}) for c in cloud_cover]
+    assert np.allclose(cloud_impact, expected)
+    
+    # Formula with max/min functions, with a scalar broadcast against an array
+    production = np.array([50, 80, 120])
+    grid_purchases = evaluate_formula_array('financial.grid_purchases', {'demand': 100, 'production': production})
+    print(f"financial.grid_purchases with demand=100, production={production} = {grid_purchases}")
+    assert grid_purchases.tolist() == [50, 20, 0]
+    
+    print("evaluate_formula_array tests passed!\n")
+
 def test_performance():
     """Test the performance of the semantic metric layer."""
     print("Testing performance...")
@@ -89,6 +110,7 @@ def main():
     
     test_get_constant()
     test_evaluate_formula()
+    test_evaluate_formula_array()
     test_performance()
     
     print("All tests passed!")
@@ -7,6 +7,8 @@ import unittest
 import tempfile
 import json
 import shutil
+import gc
+import weakref
 from datetime import datetime
 
 # Add the project root and src directory to the Python path
@@ -14,6 +16,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
 from agents.memory_system import MemorySystem
+from agents.tool_registry import ToolRegistry
 
 class TestMemorySystem(unittest.TestCase):
     """Test cases for the Memory System."""
@@ -47,13 +50,14 @@ class TestMemorySystem(unittest.TestCase):
             context_used=self.context_used
         )
         
-        # Check that the history file was created
-        history_file = os.path.join(self.temp_dir, f"{self.user_id}_history.json")
+        # Flush the buffered interaction and check that the history file was created
+        self.memory_system.flush()
+        history_file = self.memory_system._get_user_file(self.user_id, "history", "jsonl")
         self.assertTrue(os.path.exists(history_file))
         
         # Check that the interaction was saved correctly
         with open(history_file, "r") as f:
-            history = json.load(f)
+            history = [json.loads(line) for line in f]
         
         self.assertEqual(len(history), 1)
         interaction = history[0]
@@ -63,6 +67,99 @@ class TestMemorySystem(unittest.TestCase):
         self.assertEqual(interaction["context_used"], self.context_used)
         self.assertIn("timestamp", interaction)
 
+    def test_interactions_are_buffered(self):
+        """Test that interactions are written to disk every autosave interval."""
+        history_file = self.memory_system._get_user_file(self.user_id, "history", "jsonl")
+        
+        # Interactions below the autosave interval stay in memory
+        for i in range(4):
+            self.memory_system.add_interaction(
+                user_id=self.user_id,
+                query=f"Query {i}",
+                response=f"Response {i}"
+            )
+        self.assertFalse(os.path.exists(history_file))
+        
+        # Buffered interactions are still visible to readers
+        recent = self.memory_system.get_recent_interactions(self.user_id)
+        self.assertEqual(len(recent), 4)
+        self.assertEqual(recent[-1]["query"], "Query 3")
+        
+        # Reaching the interval appends the whole batch
+        self.memory_system.add_interaction(
+            user_id=self.user_id,
+            query="Query 4",
+            response="Response 4"
+        )
+        with open(history_file, "r") as f:
+            self.assertEqual(len(f.readlines()), 5)
+
+    def test_tools_used_mask(self):
+        """Test that tools_used is stored with a bitmask with a tool registry."""
+        registry = ToolRegistry()
+        for tool_name in self.tools_used:
+            registry.register_tool(
+                tool_name=tool_name,
+                tool_function=lambda: None,
+                tool_description=tool_name,
+                required_params=[]
+            )
+        memory_system = MemorySystem(storage_dir=self.temp_dir, tool_registry=registry)
+        
+        memory_system.add_interaction(
+            user_id=self.user_id,
+            query=self.query,
+            response=self.response,
+            tools_used=self.tools_used
+        )
+        memory_system.flush()
+        
+        history_file = self.memory_system._get_user_file(self.user_id, "history", "jsonl")
+        with open(history_file, "r") as f:
+            record = json.loads(f.readline())
+        self.assertEqual(record["tools_mask"], 0b11)
+        self.assertEqual(record["tools_used"], self.tools_used)
+        
+        # Names survive a registry that assigns the bits in another order
+        reordered = ToolRegistry()
+        for tool_name in reversed(self.tools_used):
+            reordered.register_tool(
+                tool_name=tool_name,
+                tool_function=lambda: None,
+                tool_description=tool_name,
+                required_params=[]
+            )
+        memory_system = MemorySystem(storage_dir=self.temp_dir, tool_registry=reordered)
+        recent = memory_system.get_recent_interactions(self.user_id)
+        self.assertEqual(recent[0]["tools_used"], self.tools_used)
+        self.assertNotIn("tools_mask", recent[0])
+
+    def test_large_fields_are_deduplicated(self):
+        """Test that large responses and contexts are stored once as blobs."""
+        large_context = "Photovoltaic cells convert sunlight. " * 100
+        for i in range(5):
+            self.memory_system.add_interaction(
+                user_id=self.user_id,
+                query=f"Query {i}",
+                response=self.response,
+                context_used=large_context
+            )
+        
+        # History records only hold a reference to the shared blob
+        history_file = self.memory_system._get_user_file(self.user_id, "history", "jsonl")
+        with open(history_file, "r") as f:
+            history = [json.loads(line) for line in f]
+        refs = {record["context_used"]["$ref"] for record in history}
+        self.assertEqual(len(refs), 1)
+        self.assertTrue(refs.pop().startswith("sha256:"))
+        
+        # Small fields are stored inline
+        self.assertEqual(history[0]["response"], self.response)
+        
+        # References are expanded on read
+        recent = self.memory_system.get_recent_interactions(self.user_id)
+        self.assertEqual(recent[-1]["context_used"], large_context)
+
     def test_get_recent_interactions(self):
         """Test that recent interactions can be retrieved."""
         # Add multiple interactions
@@ -99,7 +196,7 @@ class TestMemorySystem(unittest.TestCase):
         )
         
         # Check that the preferences file was created
-        prefs_file = os.path.join(self.temp_dir, f"{self.user_id}_preferences.json")
+        prefs_file = self.memory_system._get_user_file(self.user_id, "preferences", "json")
         self.assertTrue(os.path.exists(prefs_file))
         
         # Check that the preference was saved correctly
@@ -154,5 +251,124 @@ class TestMemorySystem(unittest.TestCase):
         )
         self.assertEqual(theme, "light")
 
+    def test_transcript_writer(self):
+        """Test that transcript records are appended as they are written."""
+        transcript_file = self.memory_system._get_user_file(self.user_id, "transcript", "jsonl")
+        with self.memory_system.transcript_writer(self.user_id) as write:
+            write({"type": "message_update", "id": "m1", "delta": "Solar "})
+            
+            # Records are visible before the writer is closed
+            with open(transcript_file, "r") as f:
+                self.assertEqual(len(f.readlines()), 1)
+            
+            write({"type": "message_complete", "id": "m1"})
+        
+        with open(transcript_file, "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["type"] for record in records],
+                         ["message_update", "message_complete"])
+
+    def test_user_files_are_sharded(self):
+        """Test that user files live in hashed shard directories."""
+        history_file = self.memory_system._get_user_file(self.user_id, "history", "jsonl")
+        shard = os.path.relpath(os.path.dirname(history_file), self.temp_dir)
+        self.assertEqual(len(shard.split(os.sep)), 2)
+        self.assertEqual(os.path.basename(history_file), f"{self.user_id}_history.jsonl")
+
+    def test_legacy_files_are_migrated(self):
+        """Test that files in the legacy flat layout are moved into their shard."""
+        # Directories are migrated by the first memory system that uses them
+        storage_dir = os.path.join(self.temp_dir, "legacy")
+        os.makedirs(storage_dir)
+        legacy_file = os.path.join(storage_dir, f"{self.user_id}_preferences.json")
+        with open(legacy_file, "w") as f:
+            json.dump({"theme": "dark"}, f)
+        
+        memory_system = MemorySystem(storage_dir=storage_dir)
+        
+        self.assertFalse(os.path.exists(legacy_file))
+        self.assertTrue(os.path.exists(
+            memory_system._get_user_file(self.user_id, "preferences")
+        ))
+        self.assertEqual(memory_system.get_user_preference(self.user_id, "theme"), "dark")
+
+    def test_legacy_history_is_converted(self):
+        """Test that a legacy JSON array history is converted to JSONL."""
+        storage_dir = os.path.join(self.temp_dir, "legacy")
+        os.makedirs(storage_dir)
+        legacy_file = os.path.join(storage_dir, f"{self.user_id}_history.json")
+        legacy = [
+            {"timestamp": datetime.now().isoformat(), "query": f"Query {i}",
+             "response": f"Response {i}", "tools_used": [], "context_used": None}
+            for i in range(2)
+        ]
+        with open(legacy_file, "w") as f:
+            json.dump(legacy, f, indent=2)
+        
+        # A JSONL history written after the upgrade is kept after the legacy records
+        jsonl_file = os.path.join(storage_dir, f"{self.user_id}_history.jsonl")
+        with open(jsonl_file, "w") as f:
+            f.write(json.dumps(dict(legacy[0], query="Query 2", response="Response 2")) + "\n")
+        
+        memory_system = MemorySystem(storage_dir=storage_dir)
+        
+        self.assertFalse(os.path.exists(legacy_file))
+        self.assertFalse(os.path.exists(jsonl_file))
+        recent = memory_system.get_recent_interactions(self.user_id)
+        self.assertEqual([record["query"] for record in recent], ["Query 0", "Query 1", "Query 2"])
+        self.assertEqual(recent[1]["response"], "Response 1")
+
+    def test_migrated_legacy_history_is_skipped(self):
+        """Test that a legacy history converted by another process is skipped."""
+        legacy_file = os.path.join(self.temp_dir, f"{self.user_id}_history.json")
+        self.memory_system._convert_legacy_history(self.user_id, legacy_file)
+        self.assertEqual(self.memory_system.get_recent_interactions(self.user_id), [])
+
+    def test_storage_dir_is_scanned_once(self):
+        """Test that memory systems sharing a directory share its blob index."""
+        memory_system = MemorySystem(storage_dir=self.temp_dir)
+        self.assertIs(memory_system._known_blobs, self.memory_system._known_blobs)
+
+    def test_instances_can_be_collected(self):
+        """Test that the exit hook does not keep memory systems alive."""
+        memory_system = MemorySystem(storage_dir=self.temp_dir)
+        ref = weakref.ref(memory_system)
+        del memory_system
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_preferences_written_elsewhere_are_seen(self):
+        """Test that cached preferences are reloaded after another process writes them."""
+        other_process = MemorySystem(storage_dir=self.temp_dir)
+        self.memory_system.store_user_preference(self.user_id, "theme", "dark")
+        self.assertEqual(other_process.get_user_preference(self.user_id, "theme"), "dark")
+        
+        self.memory_system.store_user_preference(self.user_id, "theme", "light")
+        self.assertEqual(other_process.get_user_preference(self.user_id, "theme"), "light")
+
+    def test_warmup(self):
+        """Test that warmup preloads preferences from disk."""
+        for i in range(3):
+            self.memory_system.store_user_preference(
+                user_id=f"user_{i}",
+                preference_key="theme",
+                preference_value=f"theme_{i}"
+            )
+        
+        # A fresh memory system starts with an empty cache
+        memory_system = MemorySystem(storage_dir=self.temp_dir)
+        memory_system.warmup(["user_0", "user_1", "user_2", "new_user"])
+        
+        # Without explicit users every user with preferences is loaded
+        all_users = MemorySystem(storage_dir=self.temp_dir)
+        all_users.warmup()
+        self.assertEqual(sorted(all_users._prefs_cache), ["user_0", "user_1", "user_2"])
+        
+        self.assertEqual(memory_system._prefs_cache["user_1"], {"theme": "theme_1"})
+        self.assertEqual(memory_system._prefs_cache["new_user"], {})
+        self.assertEqual(
+            memory_system.get_user_preference("user_2", "theme"), "theme_2"
+        )
+
 if __name__ == '__main__':
     unittest.main()
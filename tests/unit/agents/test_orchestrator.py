@@ -3,7 +3,10 @@ Unit tests for the Agent Orchestrator.
 """
 import os
 import sys
+import json
 import time
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -12,6 +15,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
 from agents.orchestrator import AgentOrchestrator
+from agents.memory_system import MemorySystem
 
 class TestAgentOrchestrator(unittest.TestCase):
     """Test cases for the Agent Orchestrator."""
@@ -78,5 +82,52 @@ class TestAgentOrchestrator(unittest.TestCase):
         # Verify that the weather context function was called
         mock_get_weather.assert_called_once_with(37.7749, -122.4194)
 
+    @patch('agents.orchestrator.get_weather_context_for_rag')
+    def test_process_query_stream(self, mock_get_weather):
+        """Test that the orchestrator streams the response with pre-fetched context."""
+        mock_get_weather.return_value = "Mock weather context"
+        self.orchestrator.retriever_agent = MagicMock()
+        self.orchestrator.response_generator_agent = MagicMock()
+        self.orchestrator.response_generator_agent.generate_response_stream.return_value = iter(["Solar ", "panels"])
+
+        result = self.orchestrator.process_query_stream(
+            query=self.test_query,
+            lat=37.7749,
+            lon=-122.4194,
+            include_weather=True,
+            context=["Doc 1"]
+        )
+
+        self.assertTrue(result['has_weather_context'])
+        self.assertEqual("".join(result['response_stream']), "Solar panels")
+        self.orchestrator.retriever_agent.fetch_context.assert_not_called()
+        self.orchestrator.response_generator_agent.generate_response_stream.assert_called_once_with(
+            self.test_query, ["Doc 1"], ["Mock weather context"], user_id=None
+        )
+
+    def test_process_query_stream_records_transcript(self):
+        """Test that streamed responses are recorded in the user's transcript."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        memory_system = MemorySystem(storage_dir=temp_dir)
+        orchestrator = AgentOrchestrator(memory_system=memory_system)
+        orchestrator.response_generator_agent.llm = MagicMock()
+        orchestrator.response_generator_agent.llm.stream.return_value = iter(["Solar ", "panels"])
+
+        result = orchestrator.process_query_stream(
+            query=self.test_query,
+            context=["Doc 1"],
+            user_id="test_user"
+        )
+        self.assertEqual("".join(result['response_stream']), "Solar panels")
+
+        transcript_file = memory_system._get_user_file("test_user", "transcript", "jsonl")
+        with open(transcript_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["type"] for record in records],
+                         ["message_update", "message_update", "message_complete"])
+        self.assertEqual([record["delta"] for record in records[:2]], ["Solar ", "panels"])
+        self.assertEqual(len({record["id"] for record in records}), 1)
+
 if __name__ == '__main__':
     unittest.main()
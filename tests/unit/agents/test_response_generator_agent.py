@@ -48,5 +48,15 @@ class TestResponseGeneratorAgent(unittest.TestCase):
         self.assertIsInstance(response, str)
         self.assertTrue(len(response) > 0)
 
+    def test_prompt_prefix_order(self):
+        """Test that the static prompt prefix comes before any request data."""
+        prompt = self.generator._build_prompt(self.test_query, self.test_context, ["Sunny today."])
+        warm_up_prompt = self.generator._build_prompt("", [])
+        prefix = warm_up_prompt[:warm_up_prompt.index("KNOWLEDGE BASE CONTEXT:")].rstrip()
+
+        self.assertTrue(prompt.startswith(prefix))
+        self.assertLess(prompt.index("Sunny today."), prompt.index(self.test_context[0]))
+        self.assertLess(prompt.index(self.test_context[-1]), prompt.index(self.test_query))
+
 if __name__ == '__main__':
     unittest.main()
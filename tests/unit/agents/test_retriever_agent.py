@@ -1,10 +1,12 @@
 """
 Unit tests for the Retriever Agent.
 """
+import asyncio
 import os
 import sys
 import time
 import unittest
+from unittest.mock import patch
 
 # Add the project root and src directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
@@ -49,5 +51,15 @@ class TestRetrieverAgent(unittest.TestCase):
         # But we can check that the method returns a list
         self.assertIsInstance(results, list)
 
+    @patch('agents.types.retriever.get_context_documents')
+    def test_afetch_context(self, mock_get_context_documents):
+        """Test that the async fetch delegates to the document search."""
+        mock_get_context_documents.return_value = ["Solar panels convert sunlight."]
+
+        results = asyncio.run(self.retriever.afetch_context(self.test_query, max_documents=3))
+
+        self.assertEqual(results, ["Solar panels convert sunlight."])
+        mock_get_context_documents.assert_called_once_with(self.test_query, n_results=3)
+
 if __name__ == '__main__':
     unittest.main()
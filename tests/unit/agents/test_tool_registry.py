@@ -76,6 +76,27 @@ class TestToolRegistry(unittest.TestCase):
         self.assertIn("test_tool", tool_names)
         self.assertIn("auth_tool", tool_names)
 
+    def test_tool_ids(self):
+        """Test that tools get stable ids usable as a bitmask."""
+        self.assertEqual(self.registry.tools["test_tool"]["id"], 0)
+        self.assertEqual(self.registry.tools["auth_tool"]["id"], 1)
+        
+        # Re-registering a tool keeps its id
+        self.registry.register_tool(
+            tool_name="test_tool",
+            tool_function=self.mock_tool,
+            tool_description="A test tool",
+            required_params=["param1"]
+        )
+        self.assertEqual(self.registry.tools["test_tool"]["id"], 0)
+        
+        # Encode and decode tool masks
+        mask = self.registry.encode_tools(["auth_tool", "test_tool"])
+        self.assertEqual(mask, 0b11)
+        self.assertEqual(self.registry.decode_tools(mask), ["test_tool", "auth_tool"])
+        self.assertEqual(self.registry.decode_tools(0b10), ["auth_tool"])
+        self.assertIsNone(self.registry.encode_tools(["non_existent_tool"]))
+
     def test_execute_tool(self):
         """Test that tools can be executed."""
         # Execute a tool with valid parameters
@@ -91,6 +112,24 @@ class TestToolRegistry(unittest.TestCase):
         self.assertTrue(result["success"])
         self.assertEqual(result["result"], {"result": "success"})
 
+    def test_execute_tool_without_required_params(self):
+        """Test that tools without required parameters skip validation."""
+        self.registry.register_tool(
+            tool_name="no_param_tool",
+            tool_function=self.mock_tool,
+            tool_description="A tool without parameters",
+            required_params=[]
+        )
+        result = self.registry.execute_tool("no_param_tool", params={})
+        self.mock_tool.assert_called_once_with()
+        self.assertTrue(result["success"])
+        
+        # Errors raised by the tool are reported in the result
+        self.mock_tool.side_effect = RuntimeError("boom")
+        result = self.registry.execute_tool("no_param_tool", params={})
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "boom")
+
     def test_execute_tool_missing_params(self):
         """Test that executing a tool with missing parameters raises an error."""
         with self.assertRaises(ValueError):
@@ -1,8 +1,10 @@
 """
 Unit tests for the Weather Integration module.
 """
+import asyncio
 import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from datetime import datetime
@@ -11,13 +13,17 @@ from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
+import core.config as core_config
+from agents.integrations import weather
 from agents.integrations.weather import (
     get_weather_for_location,
     extract_solar_relevant_weather,
     estimate_irradiance,
     estimate_production_impact,
     generate_weather_insights,
-    get_weather_context_for_rag
+    get_weather_context_for_rag,
+    clear_weather_cache,
+    aget_weather_for_location
 )
 
 class TestWeatherIntegration(unittest.TestCase):
@@ -25,6 +31,16 @@ class TestWeatherIntegration(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        # Keep the persistent weather cache in a temporary directory
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_path = os.path.join(temp_dir.name, "weather_cache.sqlite")
+        patcher = patch.dict(core_config.CONFIG, {"weather_cache_path": self.cache_path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        clear_weather_cache()
+
         # Sample weather data for testing
         self.sample_weather_data = {
             "current": {
@@ -79,6 +95,59 @@ class TestWeatherIntegration(unittest.TestCase):
         # Check that the result matches the mock data
         self.assertEqual(result, self.sample_weather_data)
 
+    @patch('agents.integrations.weather.fetch_weather')
+    def test_get_weather_for_location_cached(self, mock_fetch_weather):
+        """Test that repeat lookups for the same location hit the cache."""
+        mock_fetch_weather.return_value = self.sample_weather_data
+
+        first = get_weather_for_location(37.7749, -122.4194)
+        second = get_weather_for_location(37.77491, -122.41941)
+        self.assertIs(first, second)
+        mock_fetch_weather.assert_called_once()
+
+        # Different units are cached separately
+        get_weather_for_location(37.7749, -122.4194, "imperial")
+        self.assertEqual(mock_fetch_weather.call_count, 2)
+
+        # Production impact estimates are reused for the same weather data
+        impact = estimate_production_impact(first, system_capacity_kw=5.0)
+        self.assertIs(estimate_production_impact(first, system_capacity_kw=5.0), impact)
+        self.assertIsNot(estimate_production_impact(first, system_capacity_kw=10.0), impact)
+
+    @patch('agents.integrations.weather.fetch_weather')
+    def test_get_weather_for_location_persistent_cache(self, mock_fetch_weather):
+        """Test that cached responses survive losing the in-memory cache."""
+        mock_fetch_weather.return_value = self.sample_weather_data
+
+        get_weather_for_location(37.7749, -122.4194)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        # Simulate a process restart
+        weather._weather_cache.clear()
+        self.assertEqual(get_weather_for_location(37.7749, -122.4194), self.sample_weather_data)
+        mock_fetch_weather.assert_called_once()
+
+        # Expired entries are fetched again
+        weather._weather_cache.clear()
+        with patch('agents.integrations.weather.time.time',
+                   return_value=datetime.now().timestamp() + weather.WEATHER_CACHE_TTL_SECONDS + 1):
+            get_weather_for_location(37.7749, -122.4194)
+        self.assertEqual(mock_fetch_weather.call_count, 2)
+
+    @patch('agents.integrations.weather.fetch_weather')
+    @patch('agents.integrations.weather.afetch_weather')
+    def test_aget_weather_for_location_warms_cache(self, mock_afetch_weather, mock_fetch_weather):
+        """Test that async lookups share the cache with synchronous lookups."""
+        mock_afetch_weather.return_value = self.sample_weather_data
+
+        result = asyncio.run(aget_weather_for_location(37.7749, -122.4194))
+        self.assertEqual(result, self.sample_weather_data)
+        mock_afetch_weather.assert_called_once_with(37.7749, -122.4194, "metric")
+
+        # The synchronous lookup is served from the cache
+        self.assertIs(get_weather_for_location(37.7749, -122.4194), result)
+        mock_fetch_weather.assert_not_called()
+
     def test_extract_solar_relevant_weather(self):
         """Test that extract_solar_relevant_weather extracts the correct data."""
         # Call the function
@@ -0,0 +1,171 @@
+"""
+Unit tests for the chat API endpoints.
+"""
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# Add the project root and src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.endpoints import chat_endpoints
+from app.models.prompt import ChatRequest
+from app.endpoints.chat_endpoints import (
+    router,
+    sage,
+    clear_response_cache,
+    is_solar_forecast_related_query,
+    SOLAR_RAG_AVAILABLE
+)
+
+class TestChatEndpoints(unittest.TestCase):
+    """Test cases for the chat API endpoints."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        clear_response_cache()
+        app = FastAPI()
+        app.include_router(router)
+        self.client = TestClient(app)
+        self.query = "What is a solar inverter?"
+
+    @patch('app.endpoints.chat_endpoints.rag_answer')
+    def test_sage_caches_responses(self, mock_rag_answer):
+        """Test that repeated questions are answered from the cache."""
+        mock_rag_answer.return_value = "An inverter converts DC to AC."
+
+        first = self.client.post("/sage", json={"query": self.query})
+        second = self.client.post("/sage", json={"query": "  what is a SOLAR inverter? "})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(first.json()["response"], "An inverter converts DC to AC.")
+        mock_rag_answer.assert_called_once_with(self.query)
+
+        # A different location is a different cache entry
+        self.client.post("/sage", json={"query": self.query, "lat": 37.77, "lon": -122.42})
+        self.assertEqual(mock_rag_answer.call_count, 2)
+
+    @patch('app.endpoints.chat_endpoints.rag_answer')
+    def test_sage_does_not_cache_llm_errors(self, mock_rag_answer):
+        """Test that LLM error responses are not served from the cache."""
+        mock_rag_answer.side_effect = [
+            "[Ollama Error] Connection refused",
+            "An inverter converts DC to AC."
+        ]
+
+        first = self.client.post("/sage", json={"query": self.query})
+        second = self.client.post("/sage", json={"query": self.query})
+
+        self.assertEqual(first.json()["response"], "[Ollama Error] Connection refused")
+        self.assertEqual(second.json()["response"], "An inverter converts DC to AC.")
+        self.assertEqual(mock_rag_answer.call_count, 2)
+
+    @patch('app.endpoints.chat_endpoints.rag_answer')
+    def test_chat_alias(self, mock_rag_answer):
+        """Test that /chat is answered by the sage handler."""
+        mock_rag_answer.return_value = "An inverter converts DC to AC."
+
+        response = self.client.post("/chat", json={"query": self.query})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["response"], "An inverter converts DC to AC.")
+
+    @patch('app.endpoints.chat_endpoints.rag_answer')
+    def test_sage_cache_expires(self, mock_rag_answer):
+        """Test that cached responses expire after the TTL."""
+        mock_rag_answer.return_value = "An inverter converts DC to AC."
+
+        with patch('app.endpoints.chat_endpoints.time.monotonic', return_value=1000.0):
+            self.client.post("/sage", json={"query": self.query})
+
+        expired = 1000.0 + chat_endpoints.RESPONSE_CACHE_TTL_SECONDS
+        with patch('app.endpoints.chat_endpoints.time.monotonic', return_value=expired):
+            self.client.post("/sage", json={"query": self.query})
+
+        self.assertEqual(mock_rag_answer.call_count, 2)
+
+    @patch('app.endpoints.chat_endpoints.rag_answer')
+    def test_sage_strips_query(self, mock_rag_answer):
+        """Test that surrounding whitespace is stripped from the query."""
+        mock_rag_answer.return_value = "An inverter converts DC to AC."
+
+        self.client.post("/sage", json={"query": "\n  " + self.query + "  "})
+
+        mock_rag_answer.assert_called_once_with(self.query)
+
+    @patch('app.endpoints.chat_endpoints.rag_answer')
+    def test_sage_coalesces_identical_requests(self, mock_rag_answer):
+        """Test that identical concurrent requests share one RAG run."""
+        def slow_answer(query):
+            time.sleep(0.05)
+            return "An inverter converts DC to AC."
+        mock_rag_answer.side_effect = slow_answer
+
+        async def ask_twice():
+            request = ChatRequest(query=self.query)
+            return await asyncio.gather(sage(request), sage(request))
+
+        first, second = asyncio.run(ask_twice())
+
+        self.assertEqual(first.body, second.body)
+        mock_rag_answer.assert_called_once_with(self.query)
+        self.assertEqual(chat_endpoints._inflight, {})
+
+    @patch('app.endpoints.chat_endpoints.enhanced_rag_answer_stream')
+    def test_sage_stream(self, mock_stream):
+        """Test that streamed answers are sent as server-sent events."""
+        mock_stream.return_value = {
+            "response_stream": iter(["An ", "inverter ", "converts ", "DC."]),
+            "has_weather_context": False,
+            "weather_summary": None
+        }
+
+        response = self.client.post("/sage", json={"query": self.query, "stream": True})
+
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = response.text.strip().split("\n\n")
+        self.assertTrue(events[0].startswith("event: metadata\n"))
+        self.assertEqual(events[1:-1], ['data: "An "', 'data: "inverter converts "', 'data: "DC."'])
+        self.assertEqual(events[-1], "event: done\ndata: null")
+
+    @unittest.skipUnless(SOLAR_RAG_AVAILABLE, "Solar-enhanced RAG not available")
+    def test_is_solar_forecast_related_query(self):
+        """Test forecast keyword detection."""
+        self.assertTrue(is_solar_forecast_related_query("How many KWH will I get?"))
+        self.assertTrue(is_solar_forecast_related_query("When do I break even?"))
+        self.assertTrue(is_solar_forecast_related_query("Is 100kwh a lot?"))
+        self.assertTrue(is_solar_forecast_related_query("Can I SAVE money with panels"))
+        self.assertFalse(is_solar_forecast_related_query(self.query))
+
+    def test_select_route(self):
+        """Test that explicit requests and keywords pick the RAG pipeline."""
+        with patch.multiple(chat_endpoints, SOLAR_RAG_AVAILABLE=True, WEATHER_RAG_AVAILABLE=True), \
+                patch.object(chat_endpoints, 'is_solar_forecast_related_query', return_value=False), \
+                patch.object(chat_endpoints, 'is_weather_related_query', return_value=False):
+            self.assertEqual(chat_endpoints._select_route(self.query, False, True), chat_endpoints.ROUTE_SOLAR)
+            self.assertEqual(chat_endpoints._select_route(self.query, True, False), chat_endpoints.ROUTE_WEATHER)
+            self.assertEqual(chat_endpoints._select_route(self.query, False, False), chat_endpoints.ROUTE_STANDARD)
+
+        with patch.multiple(chat_endpoints, SOLAR_RAG_AVAILABLE=True, WEATHER_RAG_AVAILABLE=False), \
+                patch.object(chat_endpoints, 'is_solar_forecast_related_query', return_value=True):
+            long_query = "How much will my panels produce over the next week in this weather?"
+            self.assertEqual(chat_endpoints._select_route(long_query, False, False), chat_endpoints.ROUTE_SOLAR)
+            # Short queries and lookups skip the solar pipeline unless it is requested
+            self.assertEqual(chat_endpoints._select_route("What is the inverter cost?", False, False),
+                             chat_endpoints.ROUTE_STANDARD)
+            self.assertEqual(chat_endpoints._select_route("What is the inverter cost?", False, True),
+                             chat_endpoints.ROUTE_SOLAR)
+
+        with patch.multiple(chat_endpoints, SOLAR_RAG_AVAILABLE=False, WEATHER_RAG_AVAILABLE=False):
+            self.assertEqual(chat_endpoints._select_route(self.query, True, True), chat_endpoints.ROUTE_STANDARD)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import os
 import pytest
 from typing import Dict, Any
 
-from core.config import get_config, get_all_config
+from core.config import get_config, get_all_config, get_config_view, invalidate_config_cache, load_env_file
 
 
 def test_get_config() -> None:
@@ -30,13 +30,77 @@ def test_get_all_config() -> None:
     assert "log_level" in config
 
 
+def test_get_config_view() -> None:
+    """Test get_config_view function."""
+    view = get_config_view()
+    
+    # Check that the view matches the config and cannot be modified
+    assert dict(view) == get_all_config()
+    with pytest.raises(TypeError):
+        view["app_name"] = "Other App"
+
+
 def test_environment_override(monkeypatch: pytest.MonkeyPatch) -> None:
     """Test environment variable override."""
-    # Set environment variable
+    # Set environment variable; it is read when the config cache is rebuilt
     monkeypatch.setenv("SOLAR_SAGE_APP_NAME", "Test App")
+    invalidate_config_cache()
+    
+    try:
+        # Check that it overrides the config
+        assert get_config("app_name") == "Test App"
+        
+        # Check that it's included in all config
+        assert get_all_config()["app_name"] == "Test App"
+    finally:
+        monkeypatch.delenv("SOLAR_SAGE_APP_NAME")
+        invalidate_config_cache()
+    
+    assert get_config("app_name") == "Solar Sage"
+
+
+def test_load_env_file(tmp_path, monkeypatch) -> None:
+    """Test load_env_file function."""
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "# Comment\n"
+        "\n"
+        "SOLAR_SAGE_TEST_PLAIN=plain # trailing comment\n"
+        "export SOLAR_SAGE_TEST_QUOTED=\"quoted # value\"\n"
+        "SOLAR_SAGE_TEST_SET=from_file\n"
+        "not a variable\n"
+    )
+    # Register the variables so that monkeypatch removes them afterwards
+    for key in ("SOLAR_SAGE_TEST_PLAIN", "SOLAR_SAGE_TEST_QUOTED"):
+        monkeypatch.setenv(key, "")
+        monkeypatch.delenv(key)
+    monkeypatch.setenv("SOLAR_SAGE_TEST_SET", "from_env")
+    
+    load_env_file(str(env_file))
+    
+    # Check that values are parsed and existing variables are kept
+    assert os.environ["SOLAR_SAGE_TEST_PLAIN"] == "plain"
+    assert os.environ["SOLAR_SAGE_TEST_QUOTED"] == "quoted # value"
+    assert os.environ["SOLAR_SAGE_TEST_SET"] == "from_env"
+    
+    # Check that a missing file is ignored
+    load_env_file(str(tmp_path / "missing.env"))
+
+
+def test_load_env_file_default_path(tmp_path, monkeypatch) -> None:
+    """Test that the default .env file does not depend on the working directory."""
+    import core.config
+    
+    env_file = tmp_path / ".env"
+    env_file.write_text("SOLAR_SAGE_TEST_FOUND=yes\n")
+    monkeypatch.setenv("SOLAR_SAGE_TEST_FOUND", "")
+    monkeypatch.delenv("SOLAR_SAGE_TEST_FOUND")
+    
+    # Pretend the package lives below tmp_path and run from elsewhere
+    package_file = tmp_path / "src" / "core" / "config" / "__init__.py"
+    monkeypatch.setattr(core.config, "__file__", str(package_file))
+    monkeypatch.chdir(tmp_path.parent)
     
-    # Check that it overrides the config
-    assert get_config("app_name") == "Test App"
+    load_env_file()
     
-    # Check that it's included in all config
-    assert get_all_config()["app_name"] == "Test App"
+    assert os.environ["SOLAR_SAGE_TEST_FOUND"] == "yes"
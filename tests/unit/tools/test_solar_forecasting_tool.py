@@ -0,0 +1,84 @@
+"""
+Unit tests for the Solar Forecasting Tool.
+"""
+import os
+import sys
+import unittest
+
+# Add the project root and src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+
+from agents.tools.solar_forecasting_tool import SolarForecastingTool
+
+class TestSolarForecastingTool(unittest.TestCase):
+    """Test cases for the Solar Forecasting Tool."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tool = SolarForecastingTool()
+
+        self.forecast = {
+            "location": {"lat": 37.7749, "lon": -122.4194},
+            "system_capacity_kw": 5.0,
+            "generated_at": "2025-01-01T00:00:00",
+            "forecast_horizon_days": 3,
+            "daily_forecast": [
+                {"date": "2025-01-01", "production": 20.0, "demand": 25.0, "net": -5.0},
+                {"date": "2025-01-02", "production": 30.5, "demand": 25.0, "net": 5.5},
+                {"date": "2025-01-03", "production": 10.0, "demand": 25.0, "net": -15.0},
+            ],
+        }
+
+        self.cost_savings = {
+            "summary": {
+                "roi_days": 3,
+                "total_consumption_cost": 11.25,
+                "total_production_value": 9.08,
+                "total_grid_purchase_cost": 3.0,
+                "total_grid_export_revenue": 0.28,
+                "total_net_savings": 6.36,
+            },
+            "daily_savings": [
+                {
+                    "date": "2025-01-01",
+                    "consumption_cost": 3.75,
+                    "production_value": 3.0,
+                    "grid_purchase_cost": 0.75,
+                    "grid_export_revenue": 0.0,
+                    "net_savings": 2.25,
+                },
+            ],
+        }
+
+    def test_format_result_forecast_only(self):
+        """Test formatting a forecast without cost savings."""
+        output = self.tool.format_result(
+            {"forecast": self.forecast, "cost_savings": None}
+        )
+
+        self.assertTrue(output.startswith("# Solar Energy Forecast\n\n"))
+        self.assertIn("| 2025-01-02 | 30.5 | 25.0 | 5.5 |\n", output)
+        self.assertNotIn("## Cost Savings Analysis", output)
+
+        # Check the aggregated insights
+        self.assertIn("produce 60.5 kWh over the next 3 days", output)
+        self.assertIn("approximately 80.7% of your expected energy demand", output)
+        self.assertIn("The best day for production is 2025-01-02 with 30.5 kWh", output)
+
+    def test_format_result_with_cost_savings(self):
+        """Test formatting a forecast with cost savings."""
+        output = self.tool.format_result(
+            {"forecast": self.forecast, "cost_savings": self.cost_savings}
+        )
+
+        self.assertIn("### Summary (3 days)\n\n", output)
+        self.assertIn("- **Net Savings: $6.36**\n", output)
+        self.assertIn(
+            "| 2025-01-01 | $3.75 | $3.00 | $0.75 | $0.00 | $2.25 |\n", output
+        )
+        self.assertIn("Your estimated daily savings are $2.12", output)
+        self.assertIn("pay for itself in approximately", output)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Unit tests for the weather tools.
+"""
+import os
+import sys
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+
+# Add the project root and src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+
+from agents.tools.weather_tools import (
+    get_production_forecast,
+    get_maintenance_recommendations,
+    get_optimal_production_times,
+    analyze_weather_impact,
+    get_current_season,
+    DayForecast
+)
+
+class TestWeatherTools(unittest.TestCase):
+    """Test cases for the weather tools."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # 2025-06-02 is a Monday
+        start = datetime(2025, 6, 2, 12, 0)
+        factors = [0.9, 0.25, 0.75, 0.45, 0.8, 0.9, 0.6, 0.95]
+        weather = ["clear sky", "heavy rain", "few clouds", "light rain",
+                   "scattered clouds", "clear sky", "overcast clouds", "clear sky"]
+
+        self.impact = {
+            "current": {
+                "production_factor": 0.8,
+                "expected_kwh": 4.0,
+                "weather": "clear sky",
+                "temp": 24.0,
+                "clouds": 10,
+                "irradiance_estimate": 812.345
+            },
+            "daily_forecast": [
+                {
+                    "date": (start + timedelta(days=i)).strftime("%Y-%m-%d"),
+                    "expected_kwh": 5.0 * factor * 5.5,
+                    "production_factor": factor,
+                    "weather": weather[i],
+                    "temp": 25.0,
+                    "clouds": 20,
+                    "uvi": 6.0
+                }
+                for i, factor in enumerate(factors)
+            ]
+        }
+
+        self.weather_data = {
+            "current": {
+                "dt": int(start.timestamp()),
+                "temp": 24.0,
+                "humidity": 35,
+                "clouds": 10,
+                "uvi": 7.0,
+                "wind_speed": 2.0,
+                "weather": [{"main": "Clear", "description": "clear sky"}]
+            },
+            "daily": [
+                {
+                    "dt": int((start + timedelta(days=i)).timestamp()),
+                    "temp": {"day": 37.0 if i in (2, 4) else 28.0},
+                    "humidity": 40,
+                    "clouds": 20,
+                    "uvi": 6.0,
+                    "wind_speed": 3.0,
+                    "pop": 0.5 if i in (1, 5) else 0.0,
+                    "weather": [
+                        {"main": "Rain", "description": "heavy intensity rain"} if i == 1 else
+                        {"main": "Drizzle", "description": "light drizzle"} if i == 5 else
+                        {"main": "Snow", "description": "light snow"} if i == 0 else
+                        {"main": "Clear", "description": "clear sky"}
+                    ]
+                }
+                for i in range(8)
+            ]
+        }
+
+        patcher = patch('agents.tools.weather_tools.get_weather_for_location',
+                        return_value=self.weather_data)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch('agents.tools.weather_tools.estimate_production_impact',
+                        return_value=self.impact)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_production_forecast(self):
+        """Test that the production forecast is rounded and truncated."""
+        result = get_production_forecast(37.7749, -122.4194, system_capacity_kw=5.0, days_ahead=3)
+
+        self.assertEqual(len(result["daily_forecast"]), 3)
+        self.assertEqual(result["daily_forecast"][1], {
+            "date": "2025-06-03",
+            "expected_kwh": 6.9,
+            "production_factor": 25.0,
+            "weather": "heavy rain"
+        })
+        self.assertEqual(result["current"]["irradiance"], 812.3)
+        self.assertEqual(result["current"]["production_factor"], 80.0)
+        self.assertEqual(result["system_capacity_kw"], 5.0)
+        self.assertIn("current_conditions", result["insights"])
+
+    def test_get_optimal_production_times(self):
+        """Test that optimal days are sorted and filtered by threshold."""
+        result = get_optimal_production_times(37.7749, -122.4194, days_ahead=7, threshold_percentage=70.0)
+
+        self.assertEqual(
+            [day["date"] for day in result["optimal_days"]],
+            ["2025-06-02", "2025-06-07", "2025-06-06", "2025-06-04"]
+        )
+        self.assertEqual(result["optimal_days"][0]["production_factor"], 90.0)
+        self.assertEqual(result["best_day_of_week"], {
+            "day": "Monday",
+            "avg_production_factor": 90.0
+        })
+        self.assertEqual(result["days_analyzed"], 7)
+
+    def test_analyze_weather_impact(self):
+        """Test the weather impact totals and significant events."""
+        result = analyze_weather_impact(37.7749, -122.4194, system_capacity_kw=5.0,
+                                        expected_monthly_kwh=100.0)
+
+        total = sum(day["expected_kwh"] for day in self.impact["daily_forecast"])
+        self.assertEqual(result["total_expected_kwh_30days"], round(total, 1))
+        self.assertEqual(result["avg_daily_expected_kwh"], round(total / 8, 1))
+        self.assertEqual(result["comparison_to_expected"]["weather_impact_percentage"],
+                         round(total, 1))
+
+        self.assertEqual(result["significant_weather_events"], [
+            {
+                "date": "2025-06-03",
+                "day": "Tuesday",
+                "weather": "heavy rain",
+                "production_factor": 25.0,
+                "impact": "severe"
+            },
+            {
+                "date": "2025-06-05",
+                "day": "Thursday",
+                "weather": "light rain",
+                "production_factor": 45.0,
+                "impact": "moderate"
+            }
+        ])
+
+    @patch('agents.tools.weather_tools.datetime')
+    def test_get_maintenance_recommendations(self, mock_datetime):
+        """Test cleaning, temperature and snow recommendations."""
+        mock_datetime.now.return_value = datetime(2025, 1, 2, 9, 0)
+        mock_datetime.strptime.side_effect = datetime.strptime
+        mock_datetime.fromtimestamp.side_effect = datetime.fromtimestamp
+
+        result = get_maintenance_recommendations(
+            37.7749, -122.4194, last_cleaning_date="2024-12-01", panel_tilt=20.0
+        )
+
+        self.assertEqual(result["days_since_cleaning"], 32)
+        self.assertEqual(result["current_season"], "winter")
+        self.assertEqual(result["rain_forecast"], [
+            {"date": "2025-06-03", "intensity": "heavy"},
+            {"date": "2025-06-07", "intensity": "light"}
+        ])
+
+        # Heavy rain is coming, so no cleaning is recommended
+        types = [rec["type"] for rec in result["recommendations"]]
+        self.assertEqual(types, ["monitoring", "snow_removal"])
+        self.assertIn("2 days", result["recommendations"][0]["reason"])
+        mock_datetime.now.assert_called_once_with()
+
+    def test_day_forecast(self):
+        """Test that day forecast entries are rounded, immutable and slotted."""
+        day = DayForecast.from_impact(self.impact["daily_forecast"][1])
+
+        self.assertEqual(day.to_dict(), {
+            "date": "2025-06-03",
+            "expected_kwh": 6.9,
+            "production_factor": 25.0,
+            "weather": "heavy rain"
+        })
+        self.assertFalse(hasattr(day, "__dict__"))
+        with self.assertRaises(AttributeError):
+            day.expected_kwh = 0.0
+
+    def test_get_current_season(self):
+        """Test season lookup for both hemispheres."""
+        with patch('agents.tools.weather_tools.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2025, 7, 15)
+            self.assertEqual(get_current_season(40.0), "summer")
+            self.assertEqual(get_current_season(-33.9), "winter")
+
+            mock_datetime.now.return_value = datetime(2025, 4, 1)
+            self.assertEqual(get_current_season(0.0), "spring")
+            self.assertEqual(get_current_season(-1.0), "fall")
+
+        self.assertEqual(get_current_season(40.0, month=12), "winter")
+        self.assertEqual(get_current_season(-33.9, month=12), "summer")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ Configuration settings for the UI application.
 """
 import os
 import logging
-from dotenv import load_dotenv
+from core.config import load_env_file
 
 # Configure logging
 logging.basicConfig(
@@ -13,7 +13,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Load .env settings
-load_dotenv()
+load_env_file()
 
 # Server Configuration
 SERVER_NAME = os.getenv("GRADIO_SERVER_NAME", "0.0.0.0")